@@ -3,49 +3,243 @@
 Analyze existing downloaded videos to check their actual quality
 """
 
+import bisect
+import math
 import os
+import sqlite3
+import struct
 import subprocess
-import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 import argparse
 
 
+# Persistent cache of probe results, keyed by (path, size, mtime)
+ANALYSIS_CACHE_FILE = Path.home() / '.cache' / 'ytdl-analyzer' / 'index.sqlite'
+
+# Size buckets (MB) and the heuristic note printed for each; bisect_right puts
+# a size equal to a threshold in the bucket above it, so the last threshold is
+# the next float after 200 to keep "large" meaning strictly more than 200 MB
+SIZE_THRESHOLDS_MB = (20, 50, 100, math.nextafter(200, math.inf))
+SIZE_NOTES = (
+    " (⚠ Very small - likely low quality)",
+    " (⚠ Small - possibly 480p or lower)",
+    " (~ Moderate - possibly 720p)",
+    "",
+    " (✓ Large - likely 1080p+)",
+)
+
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mkv', '.webm', '.avi', '.mov'})
+
+# Containers whose headers we can read directly without spawning ffprobe
+MP4_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+MATROSKA_EXTENSIONS = ('.mkv', '.webm')
+
+# ISO BMFF boxes that contain the track header we are after
+_MP4_CONTAINER_BOXES = (b'moov', b'trak')
+
+# Matroska element IDs (marker bits included)
+_EBML_SEGMENT = 0x18538067
+_EBML_TRACKS = 0x1654AE6B
+_EBML_TRACK_ENTRY = 0xAE
+_EBML_VIDEO = 0xE0
+_EBML_PIXEL_WIDTH = 0xB0
+_EBML_PIXEL_HEIGHT = 0xBA
+_EBML_CLUSTER = 0x1F43B675
+
+def _iter_mp4_boxes(f: BinaryIO, start: int, end: int):
+    """Yield (type, payload_offset, box_end) for boxes in [start, end)."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        payload = pos + 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack('>Q', large)[0]
+            payload += 8
+        elif size == 0:
+            size = end - pos
+        if size < payload - pos:
+            return
+        yield box_type, payload, pos + size
+        pos += size
+
+
+def _find_mp4_dimensions(f: BinaryIO, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """Return width/height from the first video track header (tkhd) found."""
+    for box_type, payload, box_end in _iter_mp4_boxes(f, start, end):
+        if box_type in _MP4_CONTAINER_BOXES:
+            found = _find_mp4_dimensions(f, payload, box_end)
+            if found:
+                return found
+        elif box_type == b'tkhd':
+            f.seek(payload)
+            version = f.read(1)
+            if not version:
+                return None
+            # version 1 uses 64-bit times/duration: skip to the 16.16 width/height
+            f.seek(payload + (88 if version[0] == 1 else 76))
+            data = f.read(8)
+            if len(data) == 8:
+                width, height = struct.unpack('>II', data)
+                if width and height:
+                    return width >> 16, height >> 16
+    return None
+
+
+def probe_mp4_dimensions(video_path: Path) -> Optional[Tuple[int, int]]:
+    """Read video width/height from an MP4/MOV file header."""
+    with open(video_path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        return _find_mp4_dimensions(f, 0, end)
+
+
+def _read_ebml_vint(f: BinaryIO, keep_marker: bool) -> Optional[Tuple[int, int]]:
+    """Read an EBML variable-length integer, returning (value, length)."""
+    first = f.read(1)
+    if not first:
+        return None
+    lead = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not lead & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        return None
+    value = lead if keep_marker else lead & (mask - 1)
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        return None
+    for byte in rest:
+        value = (value << 8) | byte
+    return value, length
+
+
+def _iter_ebml_elements(f: BinaryIO, start: int, end: int):
+    """Yield (element_id, payload_offset, element_end) for elements in [start, end)."""
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        element_id = _read_ebml_vint(f, keep_marker=True)
+        size = _read_ebml_vint(f, keep_marker=False)
+        if element_id is None or size is None:
+            return
+        payload = pos + element_id[1] + size[1]
+        # An all-ones size means "unknown"; treat it as running to the parent's end
+        if size[0] == (1 << (7 * size[1])) - 1:
+            element_end = end
+        else:
+            element_end = payload + size[0]
+        yield element_id[0], payload, element_end
+        pos = element_end
+
+
+def _read_ebml_uint(f: BinaryIO, payload: int, element_end: int) -> int:
+    f.seek(payload)
+    return int.from_bytes(f.read(element_end - payload), 'big')
+
+
+def probe_matroska_dimensions(video_path: Path) -> Optional[Tuple[int, int]]:
+    """Read video width/height from an MKV/WebM file's Tracks element."""
+    with open(video_path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        for element_id, payload, element_end in _iter_ebml_elements(f, 0, end):
+            if element_id != _EBML_SEGMENT:
+                continue
+            for child_id, child_payload, child_end in _iter_ebml_elements(f, payload, element_end):
+                if child_id == _EBML_CLUSTER:
+                    # Track metadata always precedes the media clusters
+                    return None
+                if child_id != _EBML_TRACKS:
+                    continue
+                for entry_id, entry_payload, entry_end in _iter_ebml_elements(f, child_payload, child_end):
+                    if entry_id != _EBML_TRACK_ENTRY:
+                        continue
+                    for field_id, field_payload, field_end in _iter_ebml_elements(f, entry_payload, entry_end):
+                        if field_id != _EBML_VIDEO:
+                            continue
+                        width = height = 0
+                        for video_id, video_payload, video_end in _iter_ebml_elements(f, field_payload, field_end):
+                            if video_id == _EBML_PIXEL_WIDTH:
+                                width = _read_ebml_uint(f, video_payload, video_end)
+                            elif video_id == _EBML_PIXEL_HEIGHT:
+                                height = _read_ebml_uint(f, video_payload, video_end)
+                        if width and height:
+                            return width, height
+                return None
+    return None
+
+
+def probe_container_dimensions(video_path: Path) -> Optional[Tuple[int, int]]:
+    """Read dimensions from the container header for formats we can parse natively."""
+    suffix = video_path.suffix.lower()
+    try:
+        if suffix in MP4_EXTENSIONS:
+            return probe_mp4_dimensions(video_path)
+        if suffix in MATROSKA_EXTENSIONS:
+            return probe_matroska_dimensions(video_path)
+    except (OSError, struct.error):
+        pass
+    return None
+
+
+def _parse_dimensions(output: bytes) -> Optional[Tuple[int, int]]:
+    """Parse the first "WIDTHxHEIGHT" line printed by ffprobe/mediainfo."""
+    for line in output.splitlines():
+        width, sep, height = line.strip().partition(b'x')
+        if sep and width.isdigit() and height.isdigit():
+            return int(width), int(height)
+    return None
+
+
 def analyze_video_quality(video_path: Path) -> str:
-    """Analyze video resolution using ffprobe or mediainfo if available."""
+    """Analyze video resolution from the container header, ffprobe or mediainfo."""
     try:
-        # Try ffprobe first (bundled with FFmpeg)
+        # Read MP4/MKV headers in-process; avoids a subprocess per file
+        dimensions = probe_container_dimensions(video_path)
+        if dimensions:
+            width, height = dimensions
+            return f"{width}x{height} ({height}p)"
+
+        # Fall back to ffprobe (bundled with FFmpeg) for other containers;
+        # let it select the first video stream and print just "WxH". Output is
+        # read as raw bytes and stderr is discarded since it is never used.
         try:
             result = subprocess.run(
-                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', str(video_path)],
-                capture_output=True,
-                text=True,
+                ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                 '-show_entries', 'stream=width,height', '-of', 'csv=p=0:s=x', str(video_path)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 check=True,
             )
-            data = json.loads(result.stdout)
-            for stream in data.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    width = stream.get('width', 0)
-                    height = stream.get('height', 0)
-                    return f"{width}x{height} ({height}p)"
+            dimensions = _parse_dimensions(result.stdout)
+            if dimensions:
+                width, height = dimensions
+                return f"{width}x{height} ({height}p)"
         except Exception:
             pass
 
         # Fallback: mediainfo if available
         try:
             result = subprocess.run(
-                ['mediainfo', '--Output=JSON', str(video_path)],
-                capture_output=True,
-                text=True,
+                ['mediainfo', '--Inform=Video;%Width%x%Height%\\n', str(video_path)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 check=True,
             )
-            data = json.loads(result.stdout)
-            tracks = data.get('media', {}).get('track', [])
-            for track in tracks:
-                if track.get('@type') == 'Video':
-                    width = track.get('Width')
-                    height = track.get('Height')
-                    if width and height:
-                        return f"{width}x{height} ({height}p)"
+            dimensions = _parse_dimensions(result.stdout)
+            if dimensions:
+                width, height = dimensions
+                return f"{width}x{height} ({height}p)"
         except Exception:
             pass
 
@@ -55,7 +249,31 @@ def analyze_video_quality(video_path: Path) -> str:
         return f"Error: {e}"
 
 
-def analyze_folder(folder_path: str) -> None:
+def analyze_video_file(video_path: Path, size: Optional[int] = None) -> Dict[str, Any]:
+    """Probe a single file and return {path, quality, size} without printing."""
+    return {
+        'path': video_path,
+        'quality': analyze_video_quality(video_path),
+        'size': video_path.stat().st_size if size is None else size,
+    }
+
+
+def _open_analysis_cache(cache_file: Path) -> Optional[sqlite3.Connection]:
+    """Open (creating if needed) the quality cache; None if it is unavailable."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(cache_file))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, quality TEXT)"
+        )
+        return conn
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: Could not open analysis cache {cache_file}: {e}")
+        return None
+
+
+def analyze_folder(folder_path: str, cache_file: Optional[Path] = ANALYSIS_CACHE_FILE) -> None:
     """Analyze all videos in a folder."""
     folder = Path(folder_path)
     if not folder.exists():
@@ -65,42 +283,101 @@ def analyze_folder(folder_path: str) -> None:
     print(f"Analyzing videos in: {folder}")
     print("=" * 60)
 
-    video_extensions = ['.mp4', '.mkv', '.webm', '.avi', '.mov']
+    # One directory pass; partial downloads (e.g. "clip.mp4.part") are kept so
+    # they can be reported as incomplete
+    # DirEntry.stat() reuses data from the directory scan where the OS allows
     video_files = []
-    for ext in video_extensions:
-        video_files.extend(folder.glob(f'*{ext}'))
+    file_stats: Dict[Path, os.stat_result] = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            name = entry.name.lower()
+            if name.endswith('.part'):
+                name = name[:-len('.part')]
+            if os.path.splitext(name)[1] in VIDEO_EXTENSIONS and entry.is_file():
+                video_path = Path(entry.path)
+                video_files.append(video_path)
+                file_stats[video_path] = entry.stat()
 
     if not video_files:
         print("No video files found")
         return
 
-    total_size = 0
-    for video_file in sorted(video_files):
-        if video_file.name.endswith('.part'):
-            print(f"⚠ INCOMPLETE: {video_file.name}")
+    # Reuse earlier results for files whose size and mtime are unchanged
+    cache = _open_analysis_cache(cache_file) if cache_file else None
+    results: Dict[Path, Dict[str, Any]] = {}
+    cache_keys: Dict[Path, Tuple[str, int, int]] = {}
+    pending = []
+    resolved_folder = folder.resolve()
+    for video_path in sorted(video_files):
+        if video_path.name.endswith('.part'):
             continue
+        st = file_stats[video_path]
+        key = (str(resolved_folder / video_path.name), st.st_size, st.st_mtime_ns)
+        cache_keys[video_path] = key
+        row = None
+        if cache:
+            try:
+                row = cache.execute(
+                    "SELECT quality FROM meta WHERE path=? AND size=? AND mtime=?", key
+                ).fetchone()
+            except sqlite3.Error as e:
+                # Locked or corrupt database: carry on without the cache
+                print(f"Warning: Analysis cache unavailable, probing all files: {e}")
+                cache.close()
+                cache = None
+        if row:
+            results[video_path] = {'path': video_path, 'quality': row[0], 'size': st.st_size}
+        else:
+            pending.append(video_path)
 
-        file_size = video_file.stat().st_size
-        size_mb = file_size / (1024 * 1024)
-        total_size += file_size
+    # ffprobe runs are independent per file and mostly wait on the subprocess,
+    # so overlap them with threads. Results are printed in sorted order as soon
+    # as the next file's probe finishes, rather than after the whole batch.
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    total_size = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            p: executor.submit(analyze_video_file, p, file_stats[p].st_size) for p in pending
+        }
+        for video_file in sorted(video_files):
+            if video_file.name.endswith('.part'):
+                print(f"⚠ INCOMPLETE: {video_file.name}")
+                continue
 
-        quality = analyze_video_quality(video_file)
+            if video_file in futures:
+                results[video_file] = futures[video_file].result()
+            result = results[video_file]
+            file_size = result['size']
+            size_mb = file_size / (1024 * 1024)
+            total_size += file_size
 
-        # Heuristic note based on size
-        expected_size_note = ""
-        if size_mb < 20:
-            expected_size_note = " (⚠ Very small - likely low quality)"
-        elif size_mb < 50:
-            expected_size_note = " (⚠ Small - possibly 480p or lower)"
-        elif size_mb < 100:
-            expected_size_note = " (~ Moderate - possibly 720p)"
-        elif size_mb > 200:
-            expected_size_note = " (✓ Large - likely 1080p+)"
+            quality = result['quality']
 
-        print(f"{video_file.name}")
-        print(f"   Quality: {quality}")
-        print(f"   Size: {size_mb:.1f} MB{expected_size_note}")
-        print()
+            # Heuristic note based on size
+            expected_size_note = SIZE_NOTES[bisect.bisect_right(SIZE_THRESHOLDS_MB, size_mb)]
+
+            # One write per file rather than one per line
+            sys.stdout.write(
+                f"{video_file.name}\n"
+                f"   Quality: {quality}\n"
+                f"   Size: {size_mb:.1f} MB{expected_size_note}\n\n"
+            )
+            sys.stdout.flush()
+
+    if cache:
+        # Don't persist failures: the probing tools may be installed later
+        rows = [
+            cache_keys[p] + (results[p]['quality'],)
+            for p in pending
+            if not results[p]['quality'].startswith(('Unknown', 'Error'))
+        ]
+        try:
+            with cache:
+                cache.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update analysis cache: {e}")
+        finally:
+            cache.close()
 
     total_mb = total_size / (1024 * 1024)
     print(f"Total folder size: {total_mb:.1f} MB ({len(video_files)} videos)")
@@ -113,9 +390,14 @@ if __name__ == "__main__":
         default=str(Path(__file__).parent / 'deeplearning'),
         help="Folder path to analyze (default: ./deeplearning)",
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Re-probe every file instead of reusing cached results",
+    )
     args = parser.parse_args()
 
-    analyze_folder(args.path)
+    analyze_folder(args.path, cache_file=None if args.no_cache else ANALYSIS_CACHE_FILE)
 
     print("\n" + "=" * 60)
     print("Note: This analysis is based on file sizes and available tools.")
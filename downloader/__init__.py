@@ -9,17 +9,44 @@ A comprehensive YouTube video downloader with advanced features:
 - Download history and statistics
 """
 
-from .core import DownloadManager, YouTubeDownloader, DownloadPriority, DownloadTask
-from .config import ConfigManager, DownloadProfile
-from .error_handling import ErrorHandler, RetryStrategy, ErrorCategory
-from .progress import ProgressTracker, StateManager, DownloadHistory, DownloadState
-from .cli import main as cli_main
-
 __version__ = "2.0.0"
 __author__ = "YouTube Downloader Team"
 
-# Backwards compatibility
-from .core import YouTubeDownloader as YouTubeDownloaderLegacy
+# Public names are imported on first access (PEP 562) so that importing the
+# package, e.g. for `python -m downloader.cli --list-profiles`, doesn't pull in
+# yt-dlp, yaml and tqdm up front.
+_LAZY_IMPORTS = {
+    'DownloadManager': ('.core', 'DownloadManager'),
+    'YouTubeDownloader': ('.core', 'YouTubeDownloader'),
+    # Backwards compatibility
+    'YouTubeDownloaderLegacy': ('.core', 'YouTubeDownloader'),
+    'DownloadPriority': ('.core', 'DownloadPriority'),
+    'DownloadTask': ('.core', 'DownloadTask'),
+    'ConfigManager': ('.config', 'ConfigManager'),
+    'DownloadProfile': ('.config', 'DownloadProfile'),
+    'ErrorHandler': ('.error_handling', 'ErrorHandler'),
+    'RetryStrategy': ('.error_handling', 'RetryStrategy'),
+    'ErrorCategory': ('.error_handling', 'ErrorCategory'),
+    'ProgressTracker': ('.progress', 'ProgressTracker'),
+    'StateManager': ('.progress', 'StateManager'),
+    'DownloadHistory': ('.progress', 'DownloadHistory'),
+    'DownloadState': ('.progress', 'DownloadState'),
+    'cli_main': ('.cli', 'main'),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        module_name, attr = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
 
 __all__ = [
     'DownloadManager',
@@ -4,16 +4,18 @@ Supports profiles, queue management, batch downloads, and all new features
 """
 
 import argparse
+import mmap
+import re
 import sys
 import os
-import time
 import json
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from .core import DownloadManager, DownloadPriority
-from .config import ConfigManager, DownloadProfile
-from .utils import is_valid_youtube_url, is_playlist_url
+from .utils import YOUTUBE_URL_RE, is_valid_youtube_url, is_playlist_url
+
+if TYPE_CHECKING:
+    from .core import DownloadManager
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -211,46 +213,77 @@ Examples:
     return parser
 
 
+# Batch files at least this large are scanned through mmap instead of being read
+BATCH_MMAP_THRESHOLD = 1024 * 1024
+
+# A non-empty, non-comment line, without surrounding blanks
+_BATCH_LINE_RE = re.compile(rb'^[ \t]*([^#\s][^\r\n]*?)[ \t\r]*$', re.MULTILINE)
+
+
+def _decode_batch_line(raw: bytes) -> str:
+    """Decode a batch file line, skipping the UTF-8 decoder for plain ASCII URLs"""
+    if raw.isascii():
+        return raw.decode('ascii')
+    return raw.decode('utf-8', 'replace')
+
+
+def _read_batch_lines(file_path: str) -> List[str]:
+    """Return the stripped, non-comment lines of a batch file"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= BATCH_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return [_decode_batch_line(m.group(1)) for m in _BATCH_LINE_RE.finditer(mm)]
+        data = f.read()
+    return [_decode_batch_line(m.group(1)) for m in _BATCH_LINE_RE.finditer(data)]
+
+
 def load_urls_from_file(file_path: str) -> List[str]:
     """Load URLs from a batch file"""
     urls = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    if is_valid_youtube_url(line):
-                        urls.append(line)
-                    else:
-                        print(f"Warning: Invalid URL skipped: {line}")
+        url_search = YOUTUBE_URL_RE.search
+        for line in _read_batch_lines(file_path):
+            if url_search(line):
+                urls.append(line)
+            else:
+                print(f"Warning: Invalid URL skipped: {line}")
     except Exception as e:
         print(f"Error reading batch file {file_path}: {e}")
     
     return urls
 
 
+PROFILE_DESCRIPTIONS = (
+    ('mobile', 'Optimized for mobile devices (480p, MP4, small size)'),
+    ('desktop', 'Balanced quality for desktop viewing (best available, MP4, subtitles)'),
+    ('high_quality', 'Maximum quality for high-end displays (8K/4K/1440p+ priority)'),
+    ('archive', 'Best quality for archival purposes (best quality, MKV, all metadata)'),
+    ('audio_only', 'Audio-only downloads (best audio quality)'),
+)
+
+_PROFILES_TEXT = "\n".join(
+    ["Available Download Profiles:", "=" * 40]
+    + [f"{profile:12} - {description}" for profile, description in PROFILE_DESCRIPTIONS]
+)
+
+
 def show_profiles():
     """Show available download profiles"""
-    profiles = {
-        'mobile': 'Optimized for mobile devices (480p, MP4, small size)',
-        'desktop': 'Balanced quality for desktop viewing (best available, MP4, subtitles)',
-        'high_quality': 'Maximum quality for high-end displays (8K/4K/1440p+ priority)',
-        'archive': 'Best quality for archival purposes (best quality, MKV, all metadata)',
-        'audio_only': 'Audio-only downloads (best audio quality)'
-    }
-    
-    print("Available Download Profiles:")
-    print("=" * 40)
-    for profile, description in profiles.items():
-        print(f"{profile:12} - {description}")
+    print(_PROFILES_TEXT)
 
 
-def show_video_info(manager: DownloadManager, url: str):
-    """Show video information"""
+def _fetch_video_info(manager: 'DownloadManager', url: str) -> Optional[Dict[str, Any]]:
+    """Fetch playlist or video information for a URL"""
+    if is_playlist_url(url):
+        return manager.get_playlist_info(url)
+    return manager.get_video_info(url)
+
+
+def _print_video_info(url: str, info: Optional[Dict[str, Any]]):
+    """Print information fetched by _fetch_video_info"""
     print(f"Getting information for: {url}")
     
     if is_playlist_url(url):
-        info = manager.get_playlist_info(url)
         if info:
             print(f"Playlist: {info['title']}")
             print(f"Uploader: {info['uploader']}")
@@ -258,7 +291,6 @@ def show_video_info(manager: DownloadManager, url: str):
         else:
             print("Could not retrieve playlist information")
     else:
-        info = manager.get_video_info(url)
         if info:
             print(f"Title: {info['title']}")
             print(f"Uploader: {info['uploader']}")
@@ -269,10 +301,14 @@ def show_video_info(manager: DownloadManager, url: str):
             print("Could not retrieve video information")
 
 
-def show_formats(manager: DownloadManager, url: str):
-    """Show available formats for a video"""
+def show_video_info(manager: 'DownloadManager', url: str):
+    """Show video information"""
+    _print_video_info(url, _fetch_video_info(manager, url))
+
+
+def _print_formats(url: str, formats: List[Dict[str, Any]]):
+    """Print a format list fetched by DownloadManager.get_available_formats"""
     print(f"Available formats for: {url}")
-    formats = manager.get_available_formats(url)
     
     if formats:
         print(f"{'Format ID':<12} {'Extension':<10} {'Resolution':<12} {'Note'}")
@@ -287,6 +323,11 @@ def show_formats(manager: DownloadManager, url: str):
         print("No formats found or error retrieving formats")
 
 
+def show_formats(manager: 'DownloadManager', url: str):
+    """Show available formats for a video"""
+    _print_formats(url, manager.get_available_formats(url))
+
+
 def main():
     """Main CLI function"""
     parser = create_parser()
@@ -297,6 +338,9 @@ def main():
         show_profiles()
         return
     
+    # Imported here so the fast paths above don't pay for yaml/yt-dlp imports
+    from .config import ConfigManager, DownloadProfile
+    
     if args.create_config:
         config_manager = ConfigManager()
         config_manager.create_default_config_file()
@@ -336,6 +380,7 @@ def main():
         config_manager.apply_profile(DownloadProfile.AUDIO_ONLY)
     
     # Create download manager
+    from .core import DownloadManager, DownloadPriority
     manager = DownloadManager(config_manager)
     
     # Handle queue management commands
@@ -391,32 +436,36 @@ def main():
         urls.extend(batch_urls)
         print(f"Loaded {len(batch_urls)} URLs from batch file")
     
+    # Drop duplicates across argv and the batch file, keeping first-seen order
+    total_urls = len(urls)
+    urls = list(dict.fromkeys(urls))
+    if args.verbose and len(urls) < total_urls:
+        print(f"Deduplicated {total_urls - len(urls)} URLs")
+    
     if not urls:
         print("Error: No valid URLs provided")
         parser.print_help()
         sys.exit(1)
     
     # Handle info-only requests
+    # Metadata requests are network bound, so fetch them concurrently and
+    # print in the original URL order (iter_metadata preserves it)
     if args.info_only:
-        for url in urls:
-            show_video_info(manager, url)
+        fetched = manager.iter_metadata(lambda u: _fetch_video_info(manager, u), urls)
+        for url, info in zip(urls, fetched):
+            _print_video_info(url, info)
             print()
         return
     
     if args.list_formats:
-        for url in urls:
-            show_formats(manager, url)
+        fetched = manager.iter_metadata(manager.get_available_formats, urls)
+        for url, formats in zip(urls, fetched):
+            _print_formats(url, formats)
             print()
         return
     
     # Convert priority string to enum
-    priority_map = {
-        'low': DownloadPriority.LOW,
-        'normal': DownloadPriority.NORMAL,
-        'high': DownloadPriority.HIGH,
-        'urgent': DownloadPriority.URGENT
-    }
-    priority = priority_map[args.priority]
+    priority = DownloadPriority[args.priority.upper()]
     
     try:
         if args.no_queue:
@@ -439,30 +488,27 @@ def main():
             manager.start_queue_processing()
             
             # Add downloads to queue
-            task_ids = []
-            for url in urls:
-                task_id = manager.add_download(url, priority)
-                task_ids.append(task_id)
+            task_ids = manager.add_downloads(urls, priority)
             
             if not args.quiet:
                 print(f"Downloads queued. Task IDs: {', '.join(task_ids)}")
                 print("Monitoring progress... (Press Ctrl+C to stop)")
             
-            # Monitor progress
+            # Monitor progress: block until the manager signals it is idle,
+            # waking only to refresh the status line when it changes
             try:
-                while True:
+                last_status = None
+                while not manager.wait_until_idle(timeout=0.5):
                     status = manager.get_queue_status()
-                    active = status['active_downloads']
-                    completed = status['completed_downloads']
-                    failed = status['failed_downloads']
-                    
-                    if active == 0 and status['queue_size'] == 0:
-                        break
-                    
-                    if not args.quiet and args.show_progress:
+                    current = (status['active_downloads'], status['completed_downloads'], status['failed_downloads'])
+                    if current != last_status and not args.quiet and args.show_progress:
+                        active, completed, failed = current
                         print(f"\rActive: {active}, Completed: {completed}, Failed: {failed}", end='', flush=True)
-                    
-                    time.sleep(1)
+                    last_status = current
+                
+                status = manager.get_queue_status()
+                completed = status['completed_downloads']
+                failed = status['failed_downloads']
                 
                 if not args.quiet:
                     print(f"\nAll downloads completed. Success: {completed}, Failed: {failed}")
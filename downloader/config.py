@@ -3,14 +3,83 @@ Configuration management for YouTube Downloader
 Supports JSON/YAML config files, environment variables, and download profiles
 """
 
+import functools
+import glob
+import hashlib
 import json
 import os
-import yaml
+import pickle
+import re
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
-from dataclasses import dataclass, asdict, field
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Mapping, Optional, Tuple, Union
+from dataclasses import dataclass, field, fields, replace
 from enum import Enum
 
+from .utils import get_default_download_path
+
+
+@functools.lru_cache(maxsize=1)
+def _load_yaml():
+    """Import PyYAML on first use so JSON-only configs never pay for it.
+    
+    Returns (yaml, Loader, Dumper), preferring the libyaml C bindings when
+    PyYAML was built with them.
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as loader, CSafeDumper as dumper
+    except ImportError:
+        from yaml import SafeLoader as loader, SafeDumper as dumper
+    return yaml, loader, dumper
+
+
+try:
+    import orjson
+    
+    def _json_dumps(data: Dict[str, Any]) -> bytes:
+        """Serialize config data to indented UTF-8 JSON"""
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: Dict[str, Any]) -> bytes:
+        """Serialize config data to indented UTF-8 JSON"""
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    _json_loads = json.loads
+
+
+# Quality strings like '1080p' or '2160p'
+_HEIGHT_RE = re.compile(r'^(\d{3,4})p$')
+
+_YAML_EXTS = ('.yaml', '.yml')
+
+# Parsed copies of config files live in a private per-user directory, named
+# by a hash of the config's absolute path, never next to the config itself
+CONFIG_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'ytdl-downloader' / 'config'
+
+
+def _private_cache_dir() -> Optional[Path]:
+    """CONFIG_CACHE_DIR, created 0700; None if it can't be used safely."""
+    try:
+        CONFIG_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = CONFIG_CACHE_DIR.stat()
+    except OSError:
+        return None
+    # Pickles are loaded from here, so nobody else may be able to write into it
+    if hasattr(os, 'getuid') and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+        return None
+    return CONFIG_CACHE_DIR
+
+# Per-height fallback entries, parsed once and filled with format_map()
+_MERGE_TEMPLATES = (
+    "bestvideo[height={h}][ext={fmt}]+bestaudio[ext=m4a]",
+    "best[height={h}][ext={fmt}]",
+)
+_NOMERGE_TEMPLATES = ("best[height={h}][ext={fmt}][vcodec!=none][acodec!=none]",)
+
 
 class DownloadProfile(Enum):
     """Predefined download profiles for different use cases"""
@@ -22,7 +91,52 @@ class DownloadProfile(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+# Settings applied by each download profile (read-only; sequences are
+# tuples and become fresh lists when applied)
+PROFILE_PRESETS: Mapping[DownloadProfile, Mapping[str, Any]] = MappingProxyType({
+    DownloadProfile.MOBILE: MappingProxyType({
+        'quality': "480p",
+        'format': "mp4",
+        'write_subtitles': False,
+        'write_thumbnail': False,
+        'quality_fallback_chain': ("480p", "360p", "worst"),
+    }),
+    DownloadProfile.DESKTOP: MappingProxyType({
+        'quality': "best",  # Changed to best for highest available
+        'format': "mp4",
+        'write_subtitles': True,
+        'write_thumbnail': True,
+        'quality_fallback_chain': ("best", "2160p", "1440p", "1080p", "720p", "480p"),
+    }),
+    DownloadProfile.HIGH_QUALITY: MappingProxyType({
+        'quality': "best",  # Always get the highest available
+        'format': "mp4",
+        'write_subtitles': True,
+        'write_thumbnail': True,
+        'write_metadata': True,
+        'quality_fallback_chain': ("best", "4320p", "2880p", "2160p", "1440p"),  # 8K, 5K, 4K, 1440p
+    }),
+    DownloadProfile.ARCHIVE: MappingProxyType({
+        'quality': "best",
+        'format': "mkv",
+        'write_subtitles': True,
+        'write_thumbnail': True,
+        'write_metadata': True,
+        'write_description': True,
+        'quality_fallback_chain': ("best",),
+    }),
+    DownloadProfile.AUDIO_ONLY: MappingProxyType({
+        'quality': "bestaudio",
+        'format': "m4a",
+        'write_subtitles': False,
+        'write_thumbnail': True,
+        'quality_fallback_chain': ("bestaudio", "worst"),
+    }),
+    DownloadProfile.CUSTOM: MappingProxyType({}),
+})
+
+
+@dataclass(slots=True)
 class DownloadConfig:
     """Configuration class for download settings"""
     
@@ -45,6 +159,7 @@ class DownloadConfig:
     # Queue and concurrency
     max_concurrent_downloads: int = 3
     download_timeout: int = 300
+    concurrent_fragments: int = 4  # parallel DASH/HLS fragment fetches per download
     
     # Retry and error handling
     max_retries: int = 3
@@ -66,21 +181,146 @@ class DownloadConfig:
     def __post_init__(self):
         """Set default output directory if not provided"""
         if not self.output_dir:
-            self.output_dir = str(self._get_default_download_path())
+            self.output_dir = _default_download_path()
     
     def _get_default_download_path(self) -> Path:
         """Get default download path based on OS"""
-        if os.name == 'nt':  # Windows
-            try:
-                import winreg
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
-                                  r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
-                    downloads_path = winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0]
-                    return Path(downloads_path) / "YouTube_Downloads"
-            except:
-                return Path.home() / "Downloads" / "YouTube_Downloads"
-        else:  # Linux/Mac
-            return Path.home() / "Downloads" / "YouTube_Downloads"
+        return Path(_default_download_path())
+
+
+# Names a config file may set; anything else in the file is ignored
+_CONFIG_FIELDS = frozenset(f.name for f in fields(DownloadConfig))
+
+# Scalar fields get_yt_dlp_options() depends on; a change in any of them
+# (or in the two list fields) rebuilds the cached options dict
+_get_option_fields = attrgetter(
+    'output_dir', 'profile', 'quality', 'audio_format',
+    'write_subtitles', 'write_thumbnail', 'write_metadata', 'write_description',
+    'max_retries', 'download_timeout', 'concurrent_fragments',
+    'archive_file', 'user_agent', 'proxy',
+)
+
+
+def _copy_config(config: DownloadConfig) -> DownloadConfig:
+    """Copy a config, giving the copy its own list fields"""
+    return replace(
+        config,
+        quality_fallback_chain=list(config.quality_fallback_chain),
+        format_preference=list(config.format_preference),
+    )
+
+
+# Parsed config files for this process: abspath -> (st_mtime_ns, DownloadConfig)
+_CONFIG_CACHE: Dict[str, Tuple[int, DownloadConfig]] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def _default_download_path() -> str:
+    """Resolve the OS download folder once; it doesn't change during a run"""
+    return str(get_default_download_path())
+
+
+@functools.lru_cache(maxsize=64)
+def _compute_format_selector(profile: str,
+                             quality: str,
+                             audio_format: str,
+                             quality_fallback_chain: Tuple[str, ...],
+                             format_preference: Tuple[str, ...],
+                             ffmpeg_available: bool) -> str:
+    """Build a yt-dlp format selector; pure, so results are memoized per config"""
+    if profile == DownloadProfile.AUDIO_ONLY.value:
+        return f"bestaudio[ext={audio_format}]/bestaudio/best"
+
+    # Handle special cases
+    quality = quality.lower()
+
+    if quality in ('best', ''):
+        if ffmpeg_available:
+            return 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best[ext=mp4]/best'
+        else:
+            return 'best[ext=mp4]/best'
+
+    if quality == 'worst':
+        return 'worst[ext=mp4]/worst'
+
+    # Parse dynamic height like '1080p', '1440p', '2160p' etc.
+    match = _HEIGHT_RE.match(quality)
+    if match:
+        height = int(match.group(1))
+        if ffmpeg_available:
+            # Prefer exact height, then <= height, with merge; fall back to best
+            return (
+                f"bestvideo[height={height}][ext=mp4]+bestaudio[ext=m4a]/"
+                f"bestvideo[height={height}]+bestaudio/"
+                f"best[height={height}]/best[height<={height}]"
+            )
+        else:
+            # Without FFmpeg, prefer pre-merged formats with both audio+video
+            return (
+                f"best[height={height}][vcodec!=none][acodec!=none]/"
+                f"best[height<={height}][vcodec!=none][acodec!=none]/best"
+            )
+
+    # Build format selector with fallback chain for other cases
+    height_templates = _MERGE_TEMPLATES if ffmpeg_available else _NOMERGE_TEMPLATES
+    format_parts = []
+    append = format_parts.append
+    for quality_option in quality_fallback_chain:
+        if quality_option == "best":
+            format_parts.extend(f"best[ext={fmt}]" for fmt in format_preference)
+        elif quality_option == "worst":
+            format_parts.extend(f"worst[ext={fmt}]" for fmt in format_preference)
+        elif quality_option == "bestaudio":
+            format_parts.extend([f"bestaudio[ext={audio_format}]"] * len(format_preference))
+        else:
+            # Parse height from quality like "2160p" once per chain entry
+            height_match = _HEIGHT_RE.match(quality_option)
+            if height_match:
+                subst = {'h': int(height_match.group(1))}
+                for fmt in format_preference:
+                    subst['fmt'] = fmt
+                    for template in height_templates:
+                        append(template.format_map(subst))
+
+    # Add final fallbacks
+    format_parts.extend(["best", "worst"])
+
+    return "/".join(format_parts)
+
+
+# Environment variables that override config settings
+ENV_MAPPING = (
+    ('YT_DL_OUTPUT_DIR', 'output_dir'),
+    ('YT_DL_QUALITY', 'quality'),
+    ('YT_DL_FORMAT', 'format'),
+    ('YT_DL_WRITE_SUBS', 'write_subtitles'),
+    ('YT_DL_WRITE_THUMBNAIL', 'write_thumbnail'),
+    ('YT_DL_ARCHIVE_FILE', 'archive_file'),
+    ('YT_DL_MAX_CONCURRENT', 'max_concurrent_downloads'),
+    ('YT_DL_MAX_RETRIES', 'max_retries'),
+    ('YT_DL_PROFILE', 'profile'),
+    ('YT_DL_PROXY', 'proxy'),
+    ('YT_DL_USER_AGENT', 'user_agent'),
+)
+
+
+def _env_bool(value: str) -> bool:
+    """Interpret an environment flag such as '1' or 'yes'"""
+    return value.lower() in ('true', '1', 'yes', 'on')
+
+
+# How to convert each overridable attribute's string value; unlisted ones stay str
+_ENV_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    'write_subtitles': _env_bool,
+    'write_thumbnail': _env_bool,
+    'write_metadata': _env_bool,
+    'enable_resume': _env_bool,
+    'exponential_backoff': _env_bool,
+    'max_concurrent_downloads': int,
+    'max_retries': int,
+    'download_timeout': int,
+    'retry_delay': float,
+}
 
 
 class ConfigManager:
@@ -91,71 +331,111 @@ class ConfigManager:
     def __init__(self, config_file: Optional[str] = None):
         self.config_file = config_file or self.DEFAULT_CONFIG_FILE
         self.config = DownloadConfig()
+        self._options_cache: Optional[Dict[str, Any]] = None
+        self._options_key: Optional[tuple] = None
+        self._cookies_exists = False
+        self._cookies_checked_for: Optional[str] = None
         self._load_config()
     
     def _load_config(self):
         """Load configuration from file and environment variables"""
-        # Load from file
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    if self.config_file.endswith('.yaml') or self.config_file.endswith('.yml'):
-                        data = yaml.safe_load(f)
-                    else:
-                        data = json.load(f)
-                
-                # Update config with loaded data
-                for key, value in data.items():
-                    if hasattr(self.config, key):
-                        setattr(self.config, key, value)
-                        
-            except Exception as e:
-                print(f"Warning: Could not load config file {self.config_file}: {e}")
+        # Load from file, skipping the parse if this process already read this version
+        try:
+            mtime_ns = os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        if mtime_ns is not None:
+            cache_key = os.path.abspath(self.config_file)
+            cached = _CONFIG_CACHE.get(cache_key)
+            if cached is not None and cached[0] == mtime_ns:
+                self.config = _copy_config(cached[1])
+            else:
+                try:
+                    data = self._read_config_file(mtime_ns)
+                    
+                    # Update config with loaded data (slotted, so no __dict__ to bulk-update)
+                    config = self.config
+                    for key, value in data.items():
+                        if key in _CONFIG_FIELDS:
+                            setattr(config, key, value)
+                    
+                    _CONFIG_CACHE[cache_key] = (mtime_ns, _copy_config(config))
+                    
+                except Exception as e:
+                    print(f"Warning: Could not load config file {self.config_file}: {e}")
         
         # Override with environment variables
         self._load_env_variables()
     
+    def _read_config_file(self, mtime_ns: int) -> Dict[str, Any]:
+        """Parse the config file, reusing a pickled copy while its mtime is unchanged"""
+        cache_dir = _private_cache_dir()
+        if cache_dir is not None:
+            prefix = hashlib.sha1(os.path.abspath(self.config_file).encode('utf-8')).hexdigest()
+            cache_path = cache_dir / f"{prefix}.{mtime_ns}.pkl"
+            try:
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception:
+                pass
+        
+        if self.config_file.endswith(_YAML_EXTS):
+            # Hand libyaml the whole file as one bytes blob
+            yaml, loader, _ = _load_yaml()
+            with open(self.config_file, 'rb') as f:
+                data = yaml.load(f.read(), Loader=loader)
+        else:
+            with open(self.config_file, 'rb') as f:
+                data = _json_loads(f.read())
+        
+        if cache_dir is None:
+            return data
+        
+        # Replace caches left over from earlier versions of the file
+        for stale in glob.glob(os.path.join(glob.escape(str(cache_dir)), f"{prefix}.*.pkl")):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        
+        return data
+    
     def _load_env_variables(self):
         """Load configuration from environment variables"""
-        env_mapping = {
-            'YT_DL_OUTPUT_DIR': 'output_dir',
-            'YT_DL_QUALITY': 'quality',
-            'YT_DL_FORMAT': 'format',
-            'YT_DL_WRITE_SUBS': 'write_subtitles',
-            'YT_DL_WRITE_THUMBNAIL': 'write_thumbnail',
-            'YT_DL_ARCHIVE_FILE': 'archive_file',
-            'YT_DL_MAX_CONCURRENT': 'max_concurrent_downloads',
-            'YT_DL_MAX_RETRIES': 'max_retries',
-            'YT_DL_PROFILE': 'profile',
-            'YT_DL_PROXY': 'proxy',
-            'YT_DL_USER_AGENT': 'user_agent',
-        }
-        
-        for env_var, config_attr in env_mapping.items():
-            value = os.getenv(env_var)
+        environ = os.environ
+        for env_var, config_attr in ENV_MAPPING:
+            value = environ.get(env_var)
             if value is not None:
                 # Convert string values to appropriate types
-                if config_attr in ['write_subtitles', 'write_thumbnail', 'write_metadata', 'enable_resume', 'exponential_backoff']:
-                    value = value.lower() in ('true', '1', 'yes', 'on')
-                elif config_attr in ['max_concurrent_downloads', 'max_retries', 'download_timeout']:
-                    value = int(value)
-                elif config_attr == 'retry_delay':
-                    value = float(value)
-                
-                setattr(self.config, config_attr, value)
+                convert = _ENV_CONVERTERS.get(config_attr, str)
+                setattr(self.config, config_attr, convert(value))
     
     def save_config(self, config_file: Optional[str] = None):
         """Save current configuration to file"""
         file_path = config_file or self.config_file
         
         try:
-            config_dict = asdict(self.config)
+            # Shallow dict: the config is flat, so asdict()'s deep copy is wasted work
+            config_dict = {f.name: getattr(self.config, f.name) for f in fields(self.config)}
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                if file_path.endswith('.yaml') or file_path.endswith('.yml'):
-                    yaml.dump(config_dict, f, default_flow_style=False, indent=2)
-                else:
-                    json.dump(config_dict, f, indent=2, ensure_ascii=False)
+            if file_path.endswith(_YAML_EXTS):
+                yaml, _, dumper = _load_yaml()
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    yaml.dump(config_dict, f, Dumper=dumper, default_flow_style=False, indent=2)
+            else:
+                with open(file_path, 'wb') as f:
+                    f.write(_json_dumps(config_dict))
                     
             print(f"Configuration saved to {file_path}")
             
@@ -165,55 +445,50 @@ class ConfigManager:
     def apply_profile(self, profile: Union[str, DownloadProfile]):
         """Apply a predefined download profile"""
         if isinstance(profile, str):
-            try:
-                profile = DownloadProfile(profile)
-            except ValueError:
+            profile_enum = DownloadProfile._value2member_map_.get(profile)
+            if profile_enum is None:
                 print(f"Unknown profile: {profile}")
                 return
+            profile = profile_enum
         
         self.config.profile = profile.value
         
         # Apply profile-specific settings
-        if profile == DownloadProfile.MOBILE:
-            self.config.quality = "480p"
-            self.config.format = "mp4"
-            self.config.write_subtitles = False
-            self.config.write_thumbnail = False
-            self.config.quality_fallback_chain = ["480p", "360p", "worst"]
-            
-        elif profile == DownloadProfile.DESKTOP:
-            self.config.quality = "best"  # Changed to best for highest available
-            self.config.format = "mp4"
-            self.config.write_subtitles = True
-            self.config.write_thumbnail = True
-            self.config.quality_fallback_chain = ["best", "2160p", "1440p", "1080p", "720p", "480p"]
-            
-        elif profile == DownloadProfile.HIGH_QUALITY:
-            self.config.quality = "best"  # Always get the highest available
-            self.config.format = "mp4"
-            self.config.write_subtitles = True
-            self.config.write_thumbnail = True
-            self.config.write_metadata = True
-            self.config.quality_fallback_chain = ["best", "4320p", "2880p", "2160p", "1440p"]  # 8K, 5K, 4K, 1440p
-            
-        elif profile == DownloadProfile.ARCHIVE:
-            self.config.quality = "best"
-            self.config.format = "mkv"
-            self.config.write_subtitles = True
-            self.config.write_thumbnail = True
-            self.config.write_metadata = True
-            self.config.write_description = True
-            self.config.quality_fallback_chain = ["best"]
-            
-        elif profile == DownloadProfile.AUDIO_ONLY:
-            self.config.quality = "bestaudio"
-            self.config.format = "m4a"
-            self.config.write_subtitles = False
-            self.config.write_thumbnail = True
-            self.config.quality_fallback_chain = ["bestaudio", "worst"]
+        config = self.config
+        for key, value in PROFILE_PRESETS[profile].items():
+            setattr(config, key, list(value) if isinstance(value, tuple) else value)
+        self._options_cache = None
+        self._cookies_checked_for = None
     
     def get_yt_dlp_options(self) -> Dict[str, Any]:
         """Convert config to yt-dlp options dictionary"""
+        config = self.config
+        # Callers (and per-task overrides) may edit config in place, so the
+        # cache is keyed on the values it was built from
+        key = (
+            _get_option_fields(config),
+            tuple(config.quality_fallback_chain),
+            tuple(config.format_preference),
+        )
+        if self._options_cache is None or key != self._options_key:
+            self._options_cache = self._build_yt_dlp_options()
+            self._options_key = key
+        
+        options = self._options_cache.copy()
+        
+        # Stat the cookie file once per path rather than once per download
+        cookies_file = config.cookies_file
+        if cookies_file:
+            if self._cookies_checked_for != cookies_file:
+                self._cookies_exists = os.path.exists(cookies_file)
+                self._cookies_checked_for = cookies_file
+            if self._cookies_exists:
+                options['cookiefile'] = cookies_file
+        
+        return options
+    
+    def _build_yt_dlp_options(self) -> Dict[str, Any]:
+        """Build the cacheable part of the yt-dlp options"""
         options = {
             'outtmpl': os.path.join(self.config.output_dir, '%(title)s.%(ext)s'),
             'format': self._get_format_selector(),
@@ -223,6 +498,7 @@ class ConfigManager:
             'writedescription': self.config.write_description,
             'retries': self.config.max_retries,
             'socket_timeout': self.config.download_timeout,
+            'concurrent_fragment_downloads': self.config.concurrent_fragments,
         }
         
         if self.config.archive_file:
@@ -234,75 +510,21 @@ class ConfigManager:
         if self.config.proxy:
             options['proxy'] = self.config.proxy
         
-        if self.config.cookies_file and os.path.exists(self.config.cookies_file):
-            options['cookiefile'] = self.config.cookies_file
-        
         return options
     
     def _get_format_selector(self) -> str:
         """Generate yt-dlp format selector based on config - matches original youtube.py logic"""
-        if self.config.profile == DownloadProfile.AUDIO_ONLY.value:
-            return f"bestaudio[ext={self.config.audio_format}]/bestaudio/best"
-        
-        # Handle special cases
-        quality = self.config.quality.lower()
-        
         # Check if FFmpeg is available for merging
         ffmpeg_available = True  # Assume available, can be made configurable
         
-        if quality in ('best', ''):
-            if ffmpeg_available:
-                return 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best[ext=mp4]/best'
-            else:
-                return 'best[ext=mp4]/best'
-        
-        if quality == 'worst':
-            return 'worst[ext=mp4]/worst'
-        
-        # Parse dynamic height like '1080p', '1440p', '2160p' etc.
-        import re
-        match = re.match(r'^(\d{3,4})p$', quality)
-        if match:
-            height = int(match.group(1))
-            if ffmpeg_available:
-                # Prefer exact height, then <= height, with merge; fall back to best
-                return (
-                    f"bestvideo[height={height}][ext=mp4]+bestaudio[ext=m4a]/"
-                    f"bestvideo[height={height}]+bestaudio/"
-                    f"best[height={height}]/best[height<={height}]"
-                )
-            else:
-                # Without FFmpeg, prefer pre-merged formats with both audio+video
-                return (
-                    f"best[height={height}][vcodec!=none][acodec!=none]/"
-                    f"best[height<={height}][vcodec!=none][acodec!=none]/best"
-                )
-        
-        # Build format selector with fallback chain for other cases
-        format_parts = []
-        for quality_option in self.config.quality_fallback_chain:
-            for fmt in self.config.format_preference:
-                if quality_option == "best":
-                    format_parts.append(f"best[ext={fmt}]")
-                elif quality_option == "worst":
-                    format_parts.append(f"worst[ext={fmt}]")
-                elif quality_option == "bestaudio":
-                    format_parts.append(f"bestaudio[ext={self.config.audio_format}]")
-                else:
-                    # Parse height from quality like "2160p"
-                    height_match = re.match(r'^(\d{3,4})p$', quality_option)
-                    if height_match:
-                        height = int(height_match.group(1))
-                        if ffmpeg_available:
-                            format_parts.append(f"bestvideo[height={height}][ext={fmt}]+bestaudio[ext=m4a]")
-                            format_parts.append(f"best[height={height}][ext={fmt}]")
-                        else:
-                            format_parts.append(f"best[height={height}][ext={fmt}][vcodec!=none][acodec!=none]")
-        
-        # Add final fallbacks
-        format_parts.extend(["best", "worst"])
-        
-        return "/".join(format_parts)
+        return _compute_format_selector(
+            self.config.profile,
+            self.config.quality,
+            self.config.audio_format,
+            tuple(self.config.quality_fallback_chain),
+            tuple(self.config.format_preference),
+            ffmpeg_available,
+        )
     
     def create_default_config_file(self):
         """Create a default configuration file with all available options"""
@@ -4,17 +4,19 @@ Combines functionality from youtube.py and provides queue system, smart quality
 progress tracking, error handling, and state management
 """
 
-import asyncio
-import os
+import functools
+import heapq
+import itertools
 import re
+import shutil
 import subprocess
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set, Union, Callable
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Union, Callable
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from queue import Queue, PriorityQueue
+from queue import Empty, Queue, SimpleQueue
 from dataclasses import dataclass
 from enum import Enum
 
@@ -25,6 +27,27 @@ from .progress import ProgressTracker, StateManager, DownloadHistory, DownloadSt
 from .utils import sanitize_filename, get_default_download_path, normalize_youtube_url, is_valid_youtube_url, is_playlist_url
 
 
+# Metadata lookups are network bound, so run many more of them than downloads
+METADATA_WORKERS = 32
+
+# Most queued tasks the dispatcher starts per wake-up; small enough to keep
+# priority order fair when slots free up one at a time
+DISPATCH_BATCH = 4
+
+# Seconds between resume-state snapshots of a running download
+STATE_SAVE_INTERVAL = 5.0
+
+# Task ID source; itertools.count is atomic under the GIL, unlike clock-based IDs
+_next_task_number = itertools.count().__next__
+
+# yt-dlp options for each kind of metadata lookup
+_METADATA_YDL_OPTS = {
+    'video': {'quiet': True, 'no_warnings': True, 'extract_flat': False},
+    'playlist': {'quiet': True, 'no_warnings': True, 'extract_flat': True},
+    'formats': {'quiet': True, 'no_warnings': True, 'listformats': True},
+}
+
+
 class DownloadPriority(Enum):
     """Download priority levels"""
     LOW = 3
@@ -33,6 +56,14 @@ class DownloadPriority(Enum):
     URGENT = 0
 
 
+class TaskState(Enum):
+    """Lifecycle state of a task known to the manager"""
+    QUEUED = "queued"
+    ACTIVE = "active"
+    DONE = "done"
+    FAILED = "failed"
+
+
 @dataclass
 class DownloadTask:
     """Represents a download task in the queue"""
@@ -44,7 +75,7 @@ class DownloadTask:
     
     def __post_init__(self):
         if self.task_id is None:
-            self.task_id = f"task_{int(time.time() * 1000000)}"
+            self.task_id = f"task_{_next_task_number():x}"
     
     def __lt__(self, other):
         """For priority queue ordering"""
@@ -62,11 +93,18 @@ class DownloadManager:
         self.download_history = DownloadHistory()
         self.error_handler = ErrorHandler()
         
-        # Queue system
-        self.download_queue = PriorityQueue()
-        self.active_downloads: Dict[str, DownloadTask] = {}
-        self.completed_downloads: Dict[str, DownloadTask] = {}
-        self.failed_downloads: Dict[str, DownloadTask] = {}
+        # Queue system: a heap of (priority, sequence, task); the sequence keeps
+        # equal priorities FIFO and means tasks themselves are never compared
+        self._heap: List[tuple] = []
+        self._heap_lock = threading.Lock()
+        self._has_work = threading.Event()
+        self._queue_seq = itertools.count()
+        
+        # Every task by ID plus its state; counts are kept per state so status is O(1)
+        self._tasks: Dict[str, DownloadTask] = {}
+        self._task_state: Dict[str, TaskState] = {}
+        self._state_counts: Dict[TaskState, int] = {state: 0 for state in TaskState}
+        self._state_lock = threading.Lock()
         
         # Thread management
         self.executor = ThreadPoolExecutor(
@@ -74,6 +112,26 @@ class DownloadManager:
         )
         self.is_running = False
         self.queue_thread: Optional[threading.Thread] = None
+        self.reaper_thread: Optional[threading.Thread] = None
+        self._completions: SimpleQueue = SimpleQueue()
+        
+        # One permit per download slot; released as each download finishes
+        self._slots = threading.Semaphore(self.config_manager.config.max_concurrent_downloads)
+        
+        # Set whenever no task is queued or running, so callers can block on it
+        self._outstanding = 0
+        self._outstanding_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        
+        # Shared pool for metadata lookups, started on first use
+        self._metadata_executor: Optional[ThreadPoolExecutor] = None
+        self._metadata_lock = threading.Lock()
+        
+        # Per-thread YoutubeDL instances for metadata, reused so their HTTP
+        # sessions stay open between lookups; all are closed on shutdown
+        self._ydl_local = threading.local()
+        self._ydl_instances: List[yt_dlp.YoutubeDL] = []
         
         # Statistics
         self.stats = {
@@ -85,6 +143,7 @@ class DownloadManager:
         }
         
         # Setup callbacks
+        self._last_state_save: Dict[str, float] = {}
         self.progress_tracker.add_callback(self._on_progress_update)
     
     def start_queue_processing(self):
@@ -95,6 +154,8 @@ class DownloadManager:
         self.is_running = True
         self.queue_thread = threading.Thread(target=self._process_queue, daemon=True)
         self.queue_thread.start()
+        self.reaper_thread = threading.Thread(target=self._reap_downloads, daemon=True)
+        self.reaper_thread.start()
         print("Download queue processing started")
     
     def stop_queue_processing(self):
@@ -102,6 +163,8 @@ class DownloadManager:
         self.is_running = False
         if self.queue_thread:
             self.queue_thread.join(timeout=5)
+        if self.reaper_thread:
+            self.reaper_thread.join(timeout=5)
         print("Download queue processing stopped")
     
     def add_download(self, 
@@ -127,74 +190,222 @@ class DownloadManager:
         )
         
         # Add to queue
-        self.download_queue.put(task)
+        with self._outstanding_lock:
+            self._outstanding += 1
+            self._idle.clear()
+        self._set_task_state(task, TaskState.QUEUED)
+        with self._heap_lock:
+            heapq.heappush(self._heap, (priority.value, next(self._queue_seq), task))
+            self._has_work.set()
         self.stats['total_queued'] += 1
         
         print(f"Added download to queue: {url} (Priority: {priority.name})")
         return task.task_id  # type: ignore
     
+    def add_downloads(self,
+                      urls: List[str],
+                      priority: DownloadPriority = DownloadPriority.NORMAL,
+                      config_overrides: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Add several downloads to the queue, taking the queue lock only once"""
+        for url in urls:
+            if not is_valid_youtube_url(url):
+                raise ValueError(f"Invalid YouTube URL: {url}")
+        return self._enqueue_urls(urls, priority, config_overrides)
+    
     def add_batch_downloads(self, 
                            urls: List[str], 
                            priority: DownloadPriority = DownloadPriority.NORMAL,
                            config_overrides: Optional[Dict[str, Any]] = None) -> List[str]:
         """Add multiple downloads to the queue"""
-        task_ids = []
+        valid_urls = []
         for url in urls:
-            try:
-                task_id = self.add_download(url, priority, config_overrides)
-                task_ids.append(task_id)
-            except Exception as e:
-                print(f"Error adding {url} to queue: {e}")
-        return task_ids
+            if is_valid_youtube_url(url):
+                valid_urls.append(url)
+            else:
+                print(f"Error adding {url} to queue: Invalid YouTube URL: {url}")
+        return self._enqueue_urls(valid_urls, priority, config_overrides)
+    
+    def _enqueue_urls(self,
+                      urls: List[str],
+                      priority: DownloadPriority,
+                      config_overrides: Optional[Dict[str, Any]]) -> List[str]:
+        """Queue already-validated URLs in one batch"""
+        if not urls:
+            return []
+        
+        tasks = [
+            DownloadTask(
+                url=normalize_youtube_url(url),
+                priority=priority,
+                config_overrides=dict(config_overrides or {})
+            )
+            for url in urls
+        ]
+        
+        with self._outstanding_lock:
+            self._outstanding += len(tasks)
+            self._idle.clear()
+        
+        with self._state_lock:
+            for task in tasks:
+                task_id: str = task.task_id  # type: ignore
+                self._tasks[task_id] = task
+                self._task_state[task_id] = TaskState.QUEUED
+            self._state_counts[TaskState.QUEUED] += len(tasks)
+        
+        # One lock round-trip and one wake-up for the whole batch
+        seq = self._queue_seq
+        with self._heap_lock:
+            for task in tasks:
+                heapq.heappush(self._heap, (priority.value, next(seq), task))
+            self._has_work.set()
+        self.stats['total_queued'] += len(tasks)
+        
+        print(f"Added {len(tasks)} downloads to queue (Priority: {priority.name})")
+        return [task.task_id for task in tasks]  # type: ignore
     
     def _process_queue(self):
         """Process downloads from the queue"""
         while self.is_running:
             try:
-                # Check if we can start more downloads
-                if len(self.active_downloads) >= self.config_manager.config.max_concurrent_downloads:
-                    time.sleep(0.1)
+                # Wait for a free download slot; a finishing download wakes us at once
+                if not self._slots.acquire(timeout=1):
                     continue
                 
-                # Get next task
-                try:
-                    task = self.download_queue.get(timeout=1)
-                except:
-                    continue
-                
-                # Start download
-                self.active_downloads[task.task_id] = task
-                future = self.executor.submit(self._download_single, task)
+                # Claim any other free slots too, so a batch of tasks goes out together
+                slots = 1
+                while slots < DISPATCH_BATCH and self._slots.acquire(blocking=False):
+                    slots += 1
                 
-                # Handle completion
-                def on_complete(fut):
-                    result = False
-                    try:
-                        result = fut.result()
-                        if result:
-                            self.completed_downloads[task.task_id] = task
-                            self.stats['total_completed'] += 1
-                        else:
-                            self.failed_downloads[task.task_id] = task
-                            self.stats['total_failed'] += 1
-                    except Exception as e:
-                        self.failed_downloads[task.task_id] = task
-                        self.stats['total_failed'] += 1
-                        print(f"Download failed: {e}")
-                    finally:
-                        self.active_downloads.pop(task.task_id, None)
-                        if task.callback:
-                            try:
-                                task.callback(task, result)
-                            except Exception as e:
-                                print(f"Callback error: {e}")
+                tasks = self._pop_tasks(slots, timeout=1)
+                for _ in range(slots - len(tasks)):
+                    self._slots.release()
                 
-                future.add_done_callback(on_complete)
+                # Start downloads; completions are handed to the reaper thread
+                for task in tasks:
+                    future = self.executor.submit(self._download_single, task)
+                    future.add_done_callback(functools.partial(self._queue_completion, task))
                 
             except Exception as e:
                 print(f"Error in queue processing: {e}")
                 time.sleep(1)
     
+    def _queue_completion(self, task: DownloadTask, fut: Future):
+        """Done-callback run on the worker thread: just pass the result along"""
+        self._completions.put((task, fut))
+    
+    def _pop_tasks(self, limit: int, timeout: float) -> List[DownloadTask]:
+        """Take up to limit tasks in priority order and mark them active, waiting up to timeout for work"""
+        if not self._has_work.wait(timeout):
+            return []
+        heap = self._heap
+        with self._heap_lock:
+            tasks = [heapq.heappop(heap)[2] for _ in range(min(limit, len(heap)))]
+            for task in tasks:
+                self._set_task_state(task, TaskState.ACTIVE)
+            if not heap:
+                self._has_work.clear()
+        return tasks
+    
+    def _set_task_state(self, task: DownloadTask, state: TaskState):
+        """Move a task to a new state, keeping the per-state counts in step"""
+        self._set_task_states(((task, state),))
+    
+    def _set_task_states(self, transitions: Iterable[tuple]):
+        """Apply several (task, state) moves under one lock acquisition"""
+        with self._state_lock:
+            for task, state in transitions:
+                task_id: str = task.task_id  # type: ignore
+                previous = self._task_state.get(task_id)
+                if previous is not None:
+                    self._state_counts[previous] -= 1
+                self._tasks[task_id] = task
+                self._task_state[task_id] = state
+                self._state_counts[state] += 1
+    
+    def _get_active_task(self, task_id: str) -> Optional[DownloadTask]:
+        """Return the task if it is currently downloading"""
+        if self._task_state.get(task_id) is TaskState.ACTIVE:
+            return self._tasks.get(task_id)
+        return None
+    
+    def _tasks_in_state(self, state: TaskState) -> Dict[str, DownloadTask]:
+        """Snapshot of the tasks currently in one state"""
+        with self._state_lock:
+            return {
+                task_id: self._tasks[task_id]
+                for task_id, task_state in self._task_state.items()
+                if task_state is state
+            }
+    
+    @property
+    def active_downloads(self) -> Dict[str, DownloadTask]:
+        """Tasks currently downloading, by task ID"""
+        return self._tasks_in_state(TaskState.ACTIVE)
+    
+    @property
+    def completed_downloads(self) -> Dict[str, DownloadTask]:
+        """Tasks that finished successfully, by task ID"""
+        return self._tasks_in_state(TaskState.DONE)
+    
+    @property
+    def failed_downloads(self) -> Dict[str, DownloadTask]:
+        """Tasks that failed, by task ID"""
+        return self._tasks_in_state(TaskState.FAILED)
+    
+    def _reap_downloads(self):
+        """Record finished downloads, so worker threads never touch manager state"""
+        while self.is_running:
+            try:
+                first = self._completions.get(timeout=1)
+            except Empty:
+                continue
+            try:
+                self._record_completions(first)
+            except Exception as e:
+                print(f"Error recording completed downloads: {e}")
+    
+    def _record_completions(self, first: Optional[tuple] = None):
+        """Apply every queued completion (plus first, if given) as one batch"""
+        batch = [first] if first is not None else []
+        while True:
+            try:
+                batch.append(self._completions.get_nowait())
+            except Empty:
+                break
+        if not batch:
+            return
+        
+        outcomes = []
+        for task, fut in batch:
+            result = False
+            try:
+                result = fut.result()
+            except Exception as e:
+                print(f"Download failed: {e}")
+            outcomes.append((task, result))
+        
+        self._set_task_states(
+            (task, TaskState.DONE if result else TaskState.FAILED) for task, result in outcomes
+        )
+        completed = sum(1 for _, result in outcomes if result)
+        self.stats['total_completed'] += completed
+        self.stats['total_failed'] += len(outcomes) - completed
+        for _ in outcomes:
+            self._slots.release()
+        
+        for task, result in outcomes:
+            if task.callback:
+                try:
+                    task.callback(task, result)
+                except Exception as e:
+                    print(f"Callback error: {e}")
+        
+        with self._outstanding_lock:
+            self._outstanding -= len(outcomes)
+            if self._outstanding == 0:
+                self._idle.set()
+    
     def _download_single(self, task: DownloadTask) -> bool:
         """Download a single video"""
         try:
@@ -224,12 +435,10 @@ class DownloadManager:
                 for key, value in task.config_overrides.items():
                     setattr(config, key, value)
             
-            # Setup yt-dlp options
+            # Setup yt-dlp options ('outtmpl' comes prebuilt from the cached options,
+            # which are keyed on output_dir, so overrides are already reflected)
             ydl_opts = self.config_manager.get_yt_dlp_options()
-            ydl_opts.update({
-                'progress_hooks': [lambda d: self._progress_hook(d, task.url)],
-                'outtmpl': os.path.join(config.output_dir, '%(title)s.%(ext)s'),
-            })
+            ydl_opts['progress_hooks'] = [functools.partial(self._progress_hook, url=task.url)]
             
             # Add error handling and retry
             retry_strategy = RetryStrategy(
@@ -250,6 +459,7 @@ class DownloadManager:
             self.progress_tracker.complete_download(task.url)
             self.download_history.add_entry(progress)
             self.state_manager.remove_download_state(task.url)
+            self._last_state_save.pop(task.url, None)
             
             return True
             
@@ -258,73 +468,75 @@ class DownloadManager:
             self.progress_tracker.fail_download(task.url, str(e))
             
             # Save state for potential resume
-            if task.url in self.progress_tracker.downloads:
-                self.state_manager.save_download_state(
-                    task.url, 
-                    self.progress_tracker.downloads[task.url]
-                )
+            progress = self.progress_tracker.get_progress(task.url)
+            if progress is not None:
+                self.state_manager.save_download_state(task.url, progress)
             
             return False
     
     def _progress_hook(self, d: Dict[str, Any], url: str):
         """Progress hook for yt-dlp"""
-        if d['status'] == 'downloading':
-            downloaded = d.get('downloaded_bytes', 0)
-            total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-            speed = d.get('speed', 0)
-            
+        # Called every few KB, so read each key once and branch on a local
+        status = d['status']
+        if status == 'downloading':
+            get = d.get
             self.progress_tracker.update_download(
-                url, downloaded, total, speed=speed
+                url,
+                get('downloaded_bytes', 0),
+                get('total_bytes') or get('total_bytes_estimate', 0),
+                speed=get('speed', 0)
             )
             
-        elif d['status'] == 'finished':
+        elif status == 'finished':
             self.progress_tracker.complete_download(url)
     
     def _on_progress_update(self, url: str, progress: DownloadProgress):
         """Handle progress updates"""
-        # Save state periodically
+        # Save state periodically (progress.last_update was just refreshed by
+        # this very update, so track our own monotonic save times per URL)
         if progress.state == DownloadState.DOWNLOADING:
-            if time.time() - progress.last_update > 5:  # Save every 5 seconds
+            now = time.monotonic()
+            if now - self._last_state_save.get(url, 0.0) > STATE_SAVE_INTERVAL:
+                self._last_state_save[url] = now
                 self.state_manager.save_download_state(url, progress)
     
+    def _get_metadata_ydl(self, kind: str) -> yt_dlp.YoutubeDL:
+        """Return this thread's reusable YoutubeDL for a kind of metadata lookup"""
+        pool = getattr(self._ydl_local, 'pool', None)
+        if pool is None:
+            pool = self._ydl_local.pool = {}
+        
+        ydl = pool.get(kind)
+        if ydl is None:
+            ydl = pool[kind] = yt_dlp.YoutubeDL(dict(_METADATA_YDL_OPTS[kind]))
+            with self._metadata_lock:
+                self._ydl_instances.append(ydl)
+        return ydl
+    
     def get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
         """Get video information without downloading"""
-        ydl_opts = {
-            'quiet': True, 
-            'no_warnings': True,
-            'extract_flat': False
-        }
-        
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if info is None:
-                    return None
-                return {
-                    'title': info.get('title', 'Unknown'),
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown'),
-                    'view_count': info.get('view_count', 0),
-                    'upload_date': info.get('upload_date', ''),
-                    'description': info.get('description', ''),
-                    'formats': info.get('formats', [])
-                }
+            info = self._get_metadata_ydl('video').extract_info(url, download=False)
+            if info is None:
+                return None
+            return {
+                'title': info.get('title', 'Unknown'),
+                'duration': info.get('duration', 0),
+                'uploader': info.get('uploader', 'Unknown'),
+                'view_count': info.get('view_count', 0),
+                'upload_date': info.get('upload_date', ''),
+                'description': info.get('description', ''),
+                'formats': info.get('formats', [])
+            }
         except Exception as e:
             self.error_handler.handle_error(e, url)
             return None
     
     def get_playlist_info(self, url: str) -> Optional[Dict[str, Any]]:
         """Get playlist information"""
-        ydl_opts = {
-            'quiet': True, 
-            'no_warnings': True, 
-            'extract_flat': True
-        }
-        
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
+            info = self._get_metadata_ydl('playlist').extract_info(url, download=False)
+            
             if info and 'entries' in info:
                 entries = list(info['entries'])
                 return {
@@ -339,32 +551,38 @@ class DownloadManager:
     
     def get_available_formats(self, url: str) -> List[Dict[str, Any]]:
         """Get available video formats"""
-        ydl_opts = {
-            'quiet': True, 
-            'no_warnings': True, 
-            'listformats': True
-        }
-        
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return info.get('formats', []) if info else []
+            info = self._get_metadata_ydl('formats').extract_info(url, download=False)
+            return info.get('formats', []) if info else []
         except Exception as e:
             self.error_handler.handle_error(e, url)
             return []
     
+    def _get_metadata_executor(self) -> ThreadPoolExecutor:
+        """Start the metadata worker pool if it isn't running yet"""
+        with self._metadata_lock:
+            if self._metadata_executor is None:
+                self._metadata_executor = ThreadPoolExecutor(
+                    max_workers=METADATA_WORKERS, thread_name_prefix='metadata'
+                )
+            return self._metadata_executor
+    
+    def iter_metadata(self, fetch: Callable[[str], Any], urls: Iterable[str]) -> Iterator[Any]:
+        """Run fetch(url) for every URL concurrently, yielding results in URL order"""
+        return self._get_metadata_executor().map(fetch, urls)
+    
     def pause_download(self, task_id: str) -> bool:
         """Pause a download"""
-        if task_id in self.active_downloads:
-            task = self.active_downloads[task_id]
+        task = self._get_active_task(task_id)
+        if task:
             self.progress_tracker.pause_download(task.url)
             return True
         return False
     
     def resume_download(self, task_id: str) -> bool:
         """Resume a paused download"""
-        if task_id in self.active_downloads:
-            task = self.active_downloads[task_id]
+        task = self._get_active_task(task_id)
+        if task:
             self.progress_tracker.resume_download(task.url)
             return True
         return False
@@ -372,10 +590,10 @@ class DownloadManager:
     def cancel_download(self, task_id: str) -> bool:
         """Cancel a download"""
         # Remove from queue if not started
-        if task_id in self.active_downloads:
+        task = self._get_active_task(task_id)
+        if task:
             # Note: Actual cancellation of yt-dlp is complex
             # For now, we just mark it for cancellation
-            task = self.active_downloads[task_id]
             progress = self.progress_tracker.get_progress(task.url)
             if progress:
                 progress.state = DownloadState.CANCELLED
@@ -385,35 +603,59 @@ class DownloadManager:
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status"""
         return {
-            'queue_size': self.download_queue.qsize(),
-            'active_downloads': len(self.active_downloads),
-            'completed_downloads': len(self.completed_downloads),
-            'failed_downloads': len(self.failed_downloads),
+            'queue_size': self._state_counts[TaskState.QUEUED],
+            'active_downloads': self._state_counts[TaskState.ACTIVE],
+            'completed_downloads': self._state_counts[TaskState.DONE],
+            'failed_downloads': self._state_counts[TaskState.FAILED],
             'statistics': self.stats.copy()
         }
     
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no downloads are queued or active; returns False on timeout"""
+        return self._idle.wait(timeout)
+    
     def get_download_progress(self, task_id: str) -> Optional[DownloadProgress]:
         """Get progress for a specific download"""
-        if task_id in self.active_downloads:
-            task = self.active_downloads[task_id]
+        task = self._get_active_task(task_id)
+        if task:
             return self.progress_tracker.get_progress(task.url)
         return None
     
     def clear_completed(self):
         """Clear completed downloads from memory"""
-        self.completed_downloads.clear()
-        self.failed_downloads.clear()
+        finished = (TaskState.DONE, TaskState.FAILED)
+        with self._state_lock:
+            for task_id in [t for t, state in self._task_state.items() if state in finished]:
+                del self._task_state[task_id]
+                del self._tasks[task_id]
+            for state in finished:
+                self._state_counts[state] = 0
     
     def shutdown(self):
         """Shutdown the download manager"""
         print("Shutting down download manager...")
         self.stop_queue_processing()
         self.executor.shutdown(wait=True)
+        self._record_completions()  # downloads that finished after the reaper stopped
+        # Outside _metadata_lock: running lookups take it to register their YoutubeDL
+        if self._metadata_executor is not None:
+            self._metadata_executor.shutdown(wait=True)
+            self._metadata_executor = None
+        with self._metadata_lock:
+            for ydl in self._ydl_instances:
+                ydl.close()
+            self._ydl_instances.clear()
         self.progress_tracker.cleanup()
-        self.state_manager.save_state()
+        self.state_manager.flush()
         print("Download manager shutdown complete")
 
 
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_path() -> Optional[str]:
+    """Locate ffmpeg on PATH once per process"""
+    return shutil.which('ffmpeg')
+
+
 # Legacy wrapper for backwards compatibility
 class YouTubeDownloader(DownloadManager):
     """Backwards compatible wrapper"""
@@ -421,19 +663,22 @@ class YouTubeDownloader(DownloadManager):
     def __init__(self):
         super().__init__()
         self.download_path = Path(self.config_manager.config.output_dir)
+        self._download_path_ready = False
     
     def setup_download_path(self) -> bool:
         """Legacy method for setting up download path"""
+        if self._download_path_ready:
+            return True
         try:
             self.download_path.mkdir(parents=True, exist_ok=True)
+            self._download_path_ready = True
             return True
         except Exception:
             return False
     
     def check_ffmpeg(self) -> bool:
         """Check if FFmpeg is available"""
-        import shutil
-        return shutil.which('ffmpeg') is not None
+        return _ffmpeg_path() is not None
     
     def is_valid_youtube_url(self, url: str) -> bool:
         """Legacy method"""
@@ -3,15 +3,23 @@ Enhanced error handling system for YouTube Downloader
 Provides categorized errors, retry logic with exponential backoff, and detailed error reporting
 """
 
+import re
+import sys
+from collections import Counter, deque
 import time
 import random
 import logging
 import traceback
 from enum import Enum
-from typing import Dict, Any, Optional, Callable, List
+from typing import Deque, Dict, Any, Optional, Callable, List
 from dataclasses import dataclass
 from functools import wraps
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 
 class ErrorCategory(Enum):
     """Categories of errors that can occur during download"""
@@ -40,6 +48,49 @@ class DownloadError:
             self.timestamp = time.time()
 
 
+def _build_pattern_matcher(error_patterns: Dict[ErrorCategory, List[str]]) -> Callable[[str], Optional[ErrorCategory]]:
+    """Compile the pattern table into a single-pass matcher
+    
+    The matcher returns the earliest category in table order that has any
+    pattern in the text, same as checking the categories one by one.
+    """
+    categories = list(error_patterns)
+    ranks: Dict[str, int] = {}
+    for rank, category in enumerate(categories):
+        for pattern in error_patterns[category]:
+            ranks.setdefault(sys.intern(pattern), rank)  # a shared pattern counts for the earlier category
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for pattern, rank in ranks.items():
+            automaton.add_word(pattern, rank)
+        automaton.make_automaton()
+        
+        def find_ranks(text: str):
+            for _, rank in automaton.iter(text):
+                yield rank
+    else:
+        # The lookahead tries every position; at each one the alternation
+        # reports the best-ranked pattern starting there
+        ordered = sorted(ranks, key=ranks.__getitem__)
+        regex = re.compile('(?=(' + '|'.join(map(re.escape, ordered)) + '))')
+        
+        def find_ranks(text: str):
+            for match in regex.finditer(text):
+                yield ranks[match.group(1)]
+    
+    def match_category(text: str) -> Optional[ErrorCategory]:
+        best = None
+        for rank in find_ranks(text):
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return None if best is None else categories[best]
+    
+    return match_category
+
+
 class ErrorClassifier:
     """Classifies exceptions into appropriate error categories"""
     
@@ -75,15 +126,24 @@ class ErrorClassifier:
         ]
     }
     
+    # All patterns in one automaton (pyahocorasick if installed, else one regex)
+    _match_category = staticmethod(_build_pattern_matcher(ERROR_PATTERNS))
+    
     @classmethod
     def classify_error(cls, exception: Exception, url: Optional[str] = None) -> ErrorCategory:
         """Classify an exception into an error category"""
-        error_text = str(exception).lower()
+        return cls._classify(exception, str(exception))
+    
+    @classmethod
+    def _classify(cls, exception: Exception, message: str) -> ErrorCategory:
+        """classify_error for a message the caller has already rendered"""
+        # Patterns are lowercase; only copy the message when it has capitals
+        error_text = message if message.islower() else message.lower()
         
-        # Check each category for matching patterns
-        for category, patterns in cls.ERROR_PATTERNS.items():
-            if any(pattern in error_text for pattern in patterns):
-                return category
+        # Check all category patterns in one scan
+        category = cls._match_category(error_text)
+        if category is not None:
+            return category
         
         # Check exception type
         if isinstance(exception, (ConnectionError, TimeoutError)):
@@ -110,6 +170,7 @@ class RetryStrategy:
         self.max_delay = max_delay
         self.exponential_backoff = exponential_backoff
         self.jitter = jitter
+        self._rng = random.Random()  # own generator, not the shared module-level one
     
     def should_retry(self, error: DownloadError) -> bool:
         """Determine if an error should be retried"""
@@ -139,17 +200,25 @@ class RetryStrategy:
         
         # Add jitter to prevent thundering herd
         if self.jitter:
-            delay *= (0.5 + random.random() * 0.5)
+            delay *= (0.5 + self._rng.random() * 0.5)
         
         return delay
 
 
+# Most recent errors kept per handler; counts by category cover every error
+ERROR_HISTORY_LIMIT = 10000
+
+# Categories logged at WARNING; UNKNOWN is logged at ERROR and the rest at INFO
+_WARNING_CATEGORIES = frozenset({ErrorCategory.NETWORK, ErrorCategory.QUOTA_EXCEEDED})
+
+
 class ErrorHandler:
     """Main error handling class with logging and retry coordination"""
     
     def __init__(self, retry_strategy: Optional[RetryStrategy] = None):
         self.retry_strategy = retry_strategy or RetryStrategy()
-        self.error_history: List[DownloadError] = []
+        self.error_history: Deque[DownloadError] = deque(maxlen=ERROR_HISTORY_LIMIT)
+        self._category_counts: Counter = Counter()
         
         # Setup logging
         self.logger = logging.getLogger(__name__)
@@ -164,49 +233,50 @@ class ErrorHandler:
     
     def handle_error(self, exception: Exception, url: Optional[str] = None) -> DownloadError:
         """Process and classify an error"""
-        category = ErrorClassifier.classify_error(exception, url)
+        message = str(exception)
+        category = ErrorClassifier._classify(exception, message)
         
         error = DownloadError(
             category=category,
-            message=str(exception),
+            message=message,
             original_exception=exception,
             url=url
         )
         
         self.error_history.append(error)
+        self._category_counts[category.value] += 1
         self._log_error(error)
         
         return error
     
     def _log_error(self, error: DownloadError):
         """Log error information"""
-        log_message = f"Error ({error.category.value}): {error.message}"
-        if error.url:
-            log_message += f" [URL: {error.url}]"
-        
-        if error.category in [ErrorCategory.NETWORK, ErrorCategory.QUOTA_EXCEEDED]:
-            self.logger.warning(log_message)
+        if error.category in _WARNING_CATEGORIES:
+            level = logging.WARNING
         elif error.category == ErrorCategory.UNKNOWN:
-            self.logger.error(log_message)
-            if error.original_exception:
-                self.logger.debug(traceback.format_exc())
+            level = logging.ERROR
         else:
-            self.logger.info(log_message)
+            level = logging.INFO
+        
+        # Let the logger format the message only if the record will be emitted
+        if self.logger.isEnabledFor(level):
+            if error.url:
+                self.logger.log(level, "Error (%s): %s [URL: %s]", error.category.value, error.message, error.url)
+            else:
+                self.logger.log(level, "Error (%s): %s", error.category.value, error.message)
+        
+        if level == logging.ERROR and error.original_exception and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(traceback.format_exc())
     
     def get_error_summary(self) -> Dict[str, Any]:
         """Get summary of errors encountered"""
         if not self.error_history:
             return {"total_errors": 0}
         
-        category_counts = {}
-        for error in self.error_history:
-            category = error.category.value
-            category_counts[category] = category_counts.get(category, 0) + 1
-        
         return {
-            "total_errors": len(self.error_history),
-            "by_category": category_counts,
-            "most_recent": self.error_history[-1].message if self.error_history else None
+            "total_errors": sum(self._category_counts.values()),
+            "by_category": dict(self._category_counts),
+            "most_recent": self.error_history[-1].message
         }
 
 
@@ -215,11 +285,12 @@ def with_retry(retry_strategy: Optional[RetryStrategy] = None,
     """Decorator to add retry logic to functions"""
     
     def decorator(func: Callable) -> Callable:
+        # Defaults are built once per decorated function, not on every call
+        _retry_strategy = retry_strategy or RetryStrategy()
+        _error_handler = error_handler or ErrorHandler()
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            _retry_strategy = retry_strategy or RetryStrategy()
-            _error_handler = error_handler or ErrorHandler()
-            
             last_error = None
             
             for attempt in range(_retry_strategy.max_retries + 1):
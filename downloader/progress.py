@@ -3,18 +3,68 @@ Comprehensive progress and state management for YouTube Downloader
 Handles real-time progress tracking, download state persistence, and download history
 """
 
+import bisect
+import functools
+import hashlib
 import json
 import os
 import time
 import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Callable
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Callable, Set
 from dataclasses import dataclass, asdict, field
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
-import pickle
 
-from tqdm import tqdm
+if TYPE_CHECKING:
+    from tqdm import tqdm
+
+try:
+    import orjson
+    
+    def _json_line(data: Dict[str, Any]) -> bytes:
+        """Serialize a history entry as one UTF-8 JSON line"""
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_line(data: Dict[str, Any]) -> bytes:
+        """Serialize a history entry as one UTF-8 JSON line"""
+        return (json.dumps(data, ensure_ascii=False) + '\n').encode('utf-8')
+    
+    _json_loads = json.loads
+
+
+@functools.lru_cache(maxsize=1)
+def _load_tqdm():
+    """Import tqdm on first use, so runs that never draw a bar don't load it"""
+    from tqdm import tqdm
+    return tqdm
+
+
+# Seconds StateManager's writer waits to coalesce state changes into one write
+STATE_FLUSH_INTERVAL = 0.5
+
+# Finished downloads ProgressTracker keeps; older ones are forgotten
+# (the download history is the long-term record)
+MAX_FINISHED_TRACKED = 256
+
+# Size units, each 1024 times the one before
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
+def _human_readable_size(bytes_value: int) -> str:
+    """Convert bytes to human readable format"""
+    if bytes_value == 0:
+        return "0 B"
+    
+    if bytes_value < 1024:
+        return f"{float(bytes_value):.1f} B"
+    
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    unit_index = min((int(bytes_value).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{bytes_value / (1 << (10 * unit_index)):.1f} {_SIZE_UNITS[unit_index]}"
 
 
 class DownloadState(Enum):
@@ -28,7 +78,7 @@ class DownloadState(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadProgress:
     """Progress information for a download"""
     url: str
@@ -65,10 +115,17 @@ class DownloadProgress:
     # Resume information
     resume_data: Dict[str, Any] = field(default_factory=dict)
     
+    # start_time on the monotonic clock; set in __post_init__, never persisted
+    _monotonic_start: float = field(default=0.0, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
+        now = time.time()
         if self.start_time == 0.0:
-            self.start_time = time.time()
-        self.last_update = time.time()
+            self.start_time = now
+        self.last_update = now
+        # Intervals are measured on the monotonic clock so speed and ETA
+        # don't jump when the wall clock is adjusted
+        self._monotonic_start = time.monotonic() - (now - self.start_time)
     
     def update_progress(self, downloaded: int, total: Optional[int] = None, speed: Optional[float] = None):
         """Update progress information"""
@@ -79,8 +136,7 @@ class DownloadProgress:
         if self.total_bytes > 0:
             self.progress_percent = (self.downloaded_bytes / self.total_bytes) * 100
         
-        current_time = time.time()
-        self.elapsed_time = current_time - self.start_time
+        self.elapsed_time = time.monotonic() - self._monotonic_start
         
         if speed is not None:
             self.speed = speed
@@ -92,7 +148,7 @@ class DownloadProgress:
             remaining_bytes = self.total_bytes - self.downloaded_bytes
             self.eta = remaining_bytes / self.speed
         
-        self.last_update = current_time
+        self.last_update = self.start_time + self.elapsed_time
     
     def mark_completed(self):
         """Mark download as completed"""
@@ -108,18 +164,7 @@ class DownloadProgress:
     
     def get_human_readable_size(self, bytes_value: int) -> str:
         """Convert bytes to human readable format"""
-        if bytes_value == 0:
-            return "0 B"
-        
-        units = ['B', 'KB', 'MB', 'GB', 'TB']
-        unit_index = 0
-        size = float(bytes_value)
-        
-        while size >= 1024 and unit_index < len(units) - 1:
-            size /= 1024
-            unit_index += 1
-        
-        return f"{size:.1f} {units[unit_index]}"
+        return _human_readable_size(bytes_value)
     
     def get_human_readable_speed(self) -> str:
         """Get human readable download speed"""
@@ -130,19 +175,17 @@ class DownloadProgress:
         if self.eta <= 0:
             return "Unknown"
         
-        if self.eta < 60:
-            return f"{int(self.eta)}s"
-        elif self.eta < 3600:
-            minutes = int(self.eta // 60)
-            seconds = int(self.eta % 60)
+        minutes, seconds = divmod(int(self.eta), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}h {minutes}m"
+        elif minutes:
             return f"{minutes}m {seconds}s"
         else:
-            hours = int(self.eta // 3600)
-            minutes = int((self.eta % 3600) // 60)
-            return f"{hours}h {minutes}m"
+            return f"{seconds}s"
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadHistoryEntry:
     """Entry in download history"""
     url: str
@@ -157,77 +200,150 @@ class DownloadHistoryEntry:
     success: bool
     error_message: str = ""
     
+    # Written out field by field: asdict() walks and deep-copies every field,
+    # which is wasted work for these flat scalar values
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
-        return data
+        return {
+            'url': self.url,
+            'title': self.title,
+            'filename': self.filename,
+            'output_path': self.output_path,
+            'file_size': self.file_size,
+            'format': self.format,
+            'quality': self.quality,
+            'download_time': self.download_time,
+            'timestamp': self.timestamp.isoformat(),
+            'success': self.success,
+            'error_message': self.error_message,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DownloadHistoryEntry':
         """Create from dictionary"""
-        data = data.copy()
-        data['timestamp'] = datetime.fromisoformat(data['timestamp'])
-        return cls(**data)
+        return cls(
+            url=data['url'],
+            title=data['title'],
+            filename=data['filename'],
+            output_path=data['output_path'],
+            file_size=data['file_size'],
+            format=data['format'],
+            quality=data['quality'],
+            download_time=data['download_time'],
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            success=data['success'],
+            error_message=data.get('error_message', ""),
+        )
 
 
 class ProgressTracker:
     """Tracks progress for multiple downloads with real-time updates"""
     
-    def __init__(self):
+    def __init__(self, refresh_interval: float = 0.1, max_finished: int = MAX_FINISHED_TRACKED):
         self.downloads: Dict[str, DownloadProgress] = {}
-        self.progress_bars: Dict[str, tqdm] = {}
+        self.progress_bars: Dict[str, 'tqdm'] = {}
         self.callbacks: List[Callable[[str, DownloadProgress], None]] = []
-        self._lock = threading.Lock()
+        
+        # One lock per download, so concurrent downloads don't serialize on
+        # each other's updates; _registry_lock only guards creating those locks
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        
+        # Download threads only record which bars changed; one renderer
+        # thread repaints them at most every refresh_interval seconds, so
+        # terminal writes never hold up a download
+        self.refresh_interval = refresh_interval
+        self._redraw: Set[str] = set()
+        self._redraw_lock = threading.Lock()
+        self._redraw_wanted = threading.Event()
+        self._renderer: Optional[threading.Thread] = None
+        
+        # Completed/failed URLs, oldest first, so the tracker doesn't grow
+        # for the whole session (guarded by _registry_lock)
+        self.max_finished = max_finished
+        self._finished: OrderedDict[str, None] = OrderedDict()
     
     def start_download(self, url: str, title: str = "", **kwargs) -> DownloadProgress:
         """Start tracking a new download"""
-        with self._lock:
+        with self._registry_lock:
+            lock = self._locks.get(url)
+            if lock is None:
+                lock = self._locks[url] = threading.Lock()
+            self._finished.pop(url, None)
+            if self._renderer is None:
+                self._renderer = threading.Thread(target=self._render_loop, name="progress-renderer", daemon=True)
+                self._renderer.start()
+        
+        with lock:
             progress = DownloadProgress(url=url, title=title, **kwargs)
             progress.state = DownloadState.STARTING
             self.downloads[url] = progress
             
             # Create progress bar
             desc = title[:50] + "..." if len(title) > 50 else title
-            self.progress_bars[url] = tqdm(
+            self.progress_bars[url] = _load_tqdm()(
                 total=100,
                 desc=desc,
                 unit="%",
                 bar_format="{l_bar}{bar}| {n:.1f}% [{elapsed}<{remaining}, {rate_fmt}]"
             )
-            
-            self._notify_callbacks(url, progress)
-            return progress
+        
+        self._notify_callbacks(url, progress)
+        return progress
     
     def update_download(self, url: str, downloaded: int, total: Optional[int] = None, **kwargs):
         """Update download progress"""
-        with self._lock:
-            if url not in self.downloads:
-                return
-            
+        lock = self._locks.get(url)
+        if lock is None:
+            return
+        
+        with lock:
             progress = self.downloads[url]
             progress.update_progress(downloaded, total, **kwargs)
             progress.state = DownloadState.DOWNLOADING
-            
-            # Update progress bar
-            if url in self.progress_bars:
-                pbar = self.progress_bars[url]
-                pbar.n = progress.progress_percent
-                pbar.set_postfix({
-                    'size': progress.get_human_readable_size(progress.downloaded_bytes),
-                    'speed': progress.get_human_readable_speed(),
-                    'eta': progress.get_human_readable_eta()
-                })
-                pbar.refresh()
-            
-            self._notify_callbacks(url, progress)
+        
+        with self._redraw_lock:
+            self._redraw.add(url)
+        self._redraw_wanted.set()
+        
+        self._notify_callbacks(url, progress)
+    
+    def _render_loop(self):
+        """Repaint the bars whose downloads changed since the last pass"""
+        while True:
+            self._redraw_wanted.wait()
+            time.sleep(self.refresh_interval)
+            with self._redraw_lock:
+                self._redraw_wanted.clear()
+                urls, self._redraw = self._redraw, set()
+            for url in urls:
+                self._repaint(url)
+    
+    def _repaint(self, url: str):
+        """Draw one bar from its download's current progress"""
+        lock = self._locks.get(url)
+        if lock is None:
+            return
+        with lock:
+            pbar = self.progress_bars.get(url)
+            if pbar is None:
+                return
+            progress = self.downloads[url]
+            pbar.n = progress.progress_percent
+            pbar.set_postfix({
+                'size': progress.get_human_readable_size(progress.downloaded_bytes),
+                'speed': progress.get_human_readable_speed(),
+                'eta': progress.get_human_readable_eta()
+            }, refresh=False)  # one paint below covers both n and postfix
+            pbar.refresh()
     
     def complete_download(self, url: str):
         """Mark download as completed"""
-        with self._lock:
-            if url not in self.downloads:
-                return
-            
+        lock = self._locks.get(url)
+        if lock is None:
+            return
+        
+        with lock:
             progress = self.downloads[url]
             progress.mark_completed()
             
@@ -238,15 +354,17 @@ class ProgressTracker:
                 pbar.set_postfix({'status': 'Complete'})
                 pbar.close()
                 del self.progress_bars[url]
-            
-            self._notify_callbacks(url, progress)
+        
+        self._notify_callbacks(url, progress)
+        self._mark_finished(url)
     
     def fail_download(self, url: str, error_message: str):
         """Mark download as failed"""
-        with self._lock:
-            if url not in self.downloads:
-                return
-            
+        lock = self._locks.get(url)
+        if lock is None:
+            return
+        
+        with lock:
             progress = self.downloads[url]
             progress.mark_failed(error_message)
             
@@ -256,24 +374,41 @@ class ProgressTracker:
                 pbar.set_postfix({'status': 'Failed'})
                 pbar.close()
                 del self.progress_bars[url]
-            
-            self._notify_callbacks(url, progress)
+        
+        self._notify_callbacks(url, progress)
+        self._mark_finished(url)
+    
+    def _mark_finished(self, url: str):
+        """Record a finished download, forgetting the oldest past max_finished"""
+        with self._registry_lock:
+            self._finished[url] = None
+            self._finished.move_to_end(url)
+            while len(self._finished) > self.max_finished:
+                old_url, _ = self._finished.popitem(last=False)
+                self.downloads.pop(old_url, None)
+                self._locks.pop(old_url, None)
     
     def pause_download(self, url: str):
         """Pause a download"""
-        with self._lock:
-            if url in self.downloads:
-                self.downloads[url].state = DownloadState.PAUSED
-                if url in self.progress_bars:
-                    self.progress_bars[url].set_postfix({'status': 'Paused'})
+        lock = self._locks.get(url)
+        if lock is None:
+            return
+        
+        with lock:
+            self.downloads[url].state = DownloadState.PAUSED
+            if url in self.progress_bars:
+                self.progress_bars[url].set_postfix({'status': 'Paused'})
     
     def resume_download(self, url: str):
         """Resume a paused download"""
-        with self._lock:
-            if url in self.downloads:
-                self.downloads[url].state = DownloadState.DOWNLOADING
-                if url in self.progress_bars:
-                    self.progress_bars[url].set_postfix({'status': 'Resuming'})
+        lock = self._locks.get(url)
+        if lock is None:
+            return
+        
+        with lock:
+            self.downloads[url].state = DownloadState.DOWNLOADING
+            if url in self.progress_bars:
+                self.progress_bars[url].set_postfix({'status': 'Resuming'})
     
     def get_progress(self, url: str) -> Optional[DownloadProgress]:
         """Get progress for a specific download"""
@@ -281,14 +416,14 @@ class ProgressTracker:
     
     def get_all_progress(self) -> Dict[str, DownloadProgress]:
         """Get progress for all downloads"""
-        return self.downloads.copy()
+        return self.downloads.copy()  # a single C-level copy, atomic under the GIL
     
     def add_callback(self, callback: Callable[[str, DownloadProgress], None]):
         """Add a progress callback function"""
         self.callbacks.append(callback)
     
     def _notify_callbacks(self, url: str, progress: DownloadProgress):
-        """Notify all registered callbacks"""
+        """Notify all registered callbacks (called without the download's lock held)"""
         for callback in self.callbacks:
             try:
                 callback(url, progress)
@@ -297,51 +432,128 @@ class ProgressTracker:
     
     def cleanup(self):
         """Clean up progress bars"""
-        with self._lock:
-            for pbar in self.progress_bars.values():
-                pbar.close()
-            self.progress_bars.clear()
+        with self._registry_lock:
+            for url in list(self.progress_bars):
+                with self._locks[url]:
+                    pbar = self.progress_bars.pop(url, None)
+                    if pbar is not None:
+                        pbar.close()
 
 
 class StateManager:
     """Manages download state persistence for resume functionality"""
     
-    def __init__(self, state_file: str = "download_state.pkl"):
-        self.state_file = Path(state_file)
+    def __init__(self, state_dir: str = "download_state"):
+        # One small JSON file per URL, so saving a download costs the same
+        # however many others are tracked
+        self.state_dir = Path(state_dir)
         self.state_data: Dict[str, Any] = {}
+        
+        # Changes are written by a background thread so bursts from many
+        # downloads share one write
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty: Set[str] = set()
+        self._wake = threading.Event()
+        
         self._load_state()
+        
+        self._writer = threading.Thread(target=self._writer_loop, name="state-writer", daemon=True)
+        self._writer.start()
+    
+    def _state_path(self, url: str) -> Path:
+        """File holding the saved state for one URL"""
+        return self.state_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
     
     def _load_state(self):
-        """Load state from file"""
-        if self.state_file.exists():
+        """Load state from the state directory"""
+        if not self.state_dir.is_dir():
+            return
+        for path in self.state_dir.glob('*.json'):
             try:
-                with open(self.state_file, 'rb') as f:
-                    self.state_data = pickle.load(f)
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                self.state_data[entry['url']] = {
+                    'progress': entry['progress'],
+                    'timestamp': entry['timestamp']
+                }
             except Exception as e:
-                print(f"Warning: Could not load state file: {e}")
-                self.state_data = {}
+                print(f"Warning: Could not load state file {path.name}: {e}")
+    
+    def flush(self):
+        """Write pending changes now instead of waiting for the writer thread"""
+        with self._lock:
+            pending = self._take_dirty()
+        self._write_entries(pending)
     
     def save_state(self):
         """Save state to file"""
-        try:
-            with open(self.state_file, 'wb') as f:
-                pickle.dump(self.state_data, f)
-        except Exception as e:
-            print(f"Warning: Could not save state file: {e}")
+        self.flush()
+    
+    def _take_dirty(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Snapshot changed entries (None for removed ones); call with _lock held"""
+        pending = {url: self.state_data.get(url) for url in self._dirty}
+        self._dirty.clear()
+        return pending
+    
+    def _write_entries(self, pending: Dict[str, Optional[Dict[str, Any]]]):
+        """Write or delete per-URL state files, each replaced atomically"""
+        if not pending:
+            return
+        with self._write_lock:
+            try:
+                self.state_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"Warning: Could not create state directory: {e}")
+                return
+            for url, entry in pending.items():
+                path = self._state_path(url)
+                try:
+                    if entry is None:
+                        path.unlink(missing_ok=True)
+                        continue
+                    tmp_path = path.with_suffix('.tmp')
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump({'url': url, **entry}, f, ensure_ascii=False, default=str)
+                    os.replace(tmp_path, path)
+                except Exception as e:
+                    print(f"Warning: Could not save state for {url}: {e}")
+    
+    def _mark_dirty(self, url: str):
+        """Queue a URL for the writer thread (call with _lock held)"""
+        self._dirty.add(url)
+        self._wake.set()
+    
+    def _writer_loop(self):
+        """Write changed entries at most once per STATE_FLUSH_INTERVAL"""
+        while True:
+            self._wake.wait()
+            # Let the rest of a burst of updates arrive before writing
+            time.sleep(STATE_FLUSH_INTERVAL)
+            with self._lock:
+                self._wake.clear()
+                pending = self._take_dirty()
+            self._write_entries(pending)
     
     def save_download_state(self, url: str, progress: DownloadProgress):
         """Save state for a specific download"""
-        self.state_data[url] = {
-            'progress': asdict(progress),
+        progress_data = asdict(progress)
+        progress_data['state'] = progress.state.value
+        del progress_data['_monotonic_start']  # process-local, and not an __init__ argument
+        entry = {
+            'progress': progress_data,
             'timestamp': time.time()
         }
-        self.save_state()
+        with self._lock:
+            self.state_data[url] = entry
+            self._mark_dirty(url)
     
     def get_download_state(self, url: str) -> Optional[DownloadProgress]:
         """Get saved state for a download"""
         if url in self.state_data:
             try:
-                progress_data = self.state_data[url]['progress']
+                progress_data = dict(self.state_data[url]['progress'])
+                progress_data['state'] = DownloadState(progress_data['state'])
                 return DownloadProgress(**progress_data)
             except Exception as e:
                 print(f"Error loading state for {url}: {e}")
@@ -349,9 +561,9 @@ class StateManager:
     
     def remove_download_state(self, url: str):
         """Remove saved state for a download"""
-        if url in self.state_data:
-            del self.state_data[url]
-            self.save_state()
+        with self._lock:
+            if self.state_data.pop(url, None) is not None:
+                self._mark_dirty(url)
     
     def can_resume_download(self, url: str) -> bool:
         """Check if a download can be resumed"""
@@ -361,31 +573,78 @@ class StateManager:
         return False
 
 
+def _recency_key(entry: DownloadHistoryEntry) -> float:
+    """Sort key putting the newest history entries first"""
+    return -entry.timestamp.timestamp()
+
+
 class DownloadHistory:
     """Manages download history with search and filtering capabilities"""
     
-    def __init__(self, history_file: str = "download_history.json"):
+    def __init__(self, history_file: str = "download_history.jsonl"):
+        # JSON lines: each finished download appends one line instead of
+        # rewriting the whole history
         self.history_file = Path(history_file)
         self.entries: List[DownloadHistoryEntry] = []
+        # Same entries ordered newest first, kept sorted as entries are added
+        self._by_time: List[DownloadHistoryEntry] = []
+        # Download threads add entries concurrently; guards both lists
+        self._lock = threading.Lock()
         self._load_history()
     
     def _load_history(self):
         """Load history from file"""
         if self.history_file.exists():
+            needs_compaction = False
             try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.entries = [DownloadHistoryEntry.from_dict(entry) for entry in data]
+                with open(self.history_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            self.entries.append(DownloadHistoryEntry.from_dict(_json_loads(line)))
+                        except (ValueError, TypeError, KeyError):
+                            # e.g. a line cut short by a crash mid-append
+                            needs_compaction = True
             except Exception as e:
                 print(f"Warning: Could not load history file: {e}")
                 self.entries = []
+            if needs_compaction:
+                print(f"Warning: Skipped unreadable lines in {self.history_file.name}")
+                self.save_history()
+        else:
+            self._import_legacy_history()
+        self._by_time = sorted(self.entries, key=_recency_key)
+    
+    def _import_legacy_history(self):
+        """Convert a history saved as one JSON array by older versions"""
+        legacy_file = self.history_file.with_suffix('.json')
+        if legacy_file == self.history_file or not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'rb') as f:
+                self.entries = [DownloadHistoryEntry.from_dict(entry) for entry in _json_loads(f.read())]
+        except Exception as e:
+            print(f"Warning: Could not load history file: {e}")
+            self.entries = []
+            return
+        self.save_history()
     
     def save_history(self):
-        """Save history to file"""
+        """Rewrite the whole history file, compacted to one line per entry"""
+        tmp_path = self.history_file.with_suffix('.tmp')
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                data = [entry.to_dict() for entry in self.entries]
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(tmp_path, 'wb') as f:
+                f.writelines(_json_line(entry.to_dict()) for entry in self.entries)
+            os.replace(tmp_path, self.history_file)
+        except Exception as e:
+            print(f"Warning: Could not save history file: {e}")
+    
+    def _append_history(self, entry: DownloadHistoryEntry):
+        """Append one entry to the history file"""
+        try:
+            with open(self.history_file, 'ab') as f:
+                f.write(_json_line(entry.to_dict()))
         except Exception as e:
             print(f"Warning: Could not save history file: {e}")
     
@@ -405,12 +664,14 @@ class DownloadHistory:
             error_message=progress.error_message
         )
         
-        self.entries.append(entry)
-        self.save_history()
+        with self._lock:
+            self.entries.append(entry)
+            bisect.insort(self._by_time, entry, key=_recency_key)
+        self._append_history(entry)
     
     def get_recent_downloads(self, limit: int = 10) -> List[DownloadHistoryEntry]:
         """Get recent downloads"""
-        return sorted(self.entries, key=lambda x: x.timestamp, reverse=True)[:limit]
+        return self._by_time[:limit]
     
     def search_downloads(self, query: str) -> List[DownloadHistoryEntry]:
         """Search downloads by title or URL"""
@@ -429,10 +690,16 @@ class DownloadHistory:
         if not self.entries:
             return {"total_downloads": 0}
         
+        # One pass over the history instead of a filter and two sums
         total_downloads = len(self.entries)
-        successful_downloads = len([e for e in self.entries if e.success])
-        total_size = sum(e.file_size for e in self.entries if e.success)
-        total_time = sum(e.download_time for e in self.entries if e.success)
+        successful_downloads = 0
+        total_size = 0
+        total_time = 0
+        for e in self.entries:
+            if e.success:
+                successful_downloads += 1
+                total_size += e.file_size
+                total_time += e.download_time
         
         return {
             "total_downloads": total_downloads,
@@ -1,65 +1,93 @@
 # downloader/utils.py
 # Utility functions for YouTube downloader (ffmpeg checks, filename sanitize, URL normalize, etc.)
 
+import functools
 import os
 import re
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from urllib.parse import urlparse
+
+# Characters not allowed in filenames, mapped to '_' in a single translate pass
+_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
 
 def sanitize_filename(filename: str) -> str:
-    invalid_chars = '<>:"/\\|?*'
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
-    return filename[:200]
+    return filename.translate(_SANITIZE_TABLE)[:200]
+
+def _windows_downloads_folder() -> Path:
+    # SHGetKnownFolderPath(FOLDERID_Downloads) is the documented lookup;
+    # the Shell Folders registry value is a legacy mirror of it
+    import ctypes
+    from ctypes import wintypes
+
+    class GUID(ctypes.Structure):
+        _fields_ = [("Data1", wintypes.DWORD), ("Data2", wintypes.WORD),
+                    ("Data3", wintypes.WORD), ("Data4", ctypes.c_ubyte * 8)]
+
+    folder_id = GUID(0x374DE290, 0x123F, 0x4565,
+                     (ctypes.c_ubyte * 8)(0x91, 0x64, 0x39, 0xC4, 0x92, 0x5E, 0x46, 0x7B))
+    path_ptr = ctypes.c_wchar_p()
+    result = ctypes.windll.shell32.SHGetKnownFolderPath(ctypes.byref(folder_id), 0, None, ctypes.byref(path_ptr))
+    try:
+        if result != 0:
+            raise OSError(f"SHGetKnownFolderPath failed: {result:#x}")
+        return Path(path_ptr.value)
+    finally:
+        ctypes.windll.ole32.CoTaskMemFree(path_ptr)
+
+def _registry_downloads_folder() -> Path:
+    import winreg
+    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
+        return Path(winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0])
 
+# The download folder can't change during a run, so it is looked up once
+@functools.lru_cache(maxsize=1)
 def get_default_download_path() -> Path:
     if os.name == 'nt':
-        try:
-            import winreg
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
-                downloads_path = winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0]
-                return Path(downloads_path) / "YouTube_Downloads"
-        except:
-            return Path.home() / "Downloads" / "YouTube_Downloads"
-    else:
-        return Path.home() / "Downloads" / "YouTube_Downloads"
+        for lookup in (_windows_downloads_folder, _registry_downloads_folder):
+            try:
+                return lookup() / "YouTube_Downloads"
+            except Exception:
+                pass
+    return Path.home() / "Downloads" / "YouTube_Downloads"
+
+# URLs starting with these are already canonical and skip parsing entirely
+_CANONICAL_URL_PREFIXES = (
+    'https://www.youtube.com/', 'https://m.youtube.com/',
+    'http://www.youtube.com/', 'https://youtube.com/',
+)
 
 def normalize_youtube_url(url: str) -> str:
+    if url.startswith(_CANONICAL_URL_PREFIXES):
+        return url
     try:
         p = urlparse(url)
         if p.netloc.endswith('youtube.com'):
             return url
         if p.netloc.endswith('youtu.be'):
             video_id = p.path.lstrip('/')
-            qs = parse_qs(p.query)
-            qs_flat = []
-            for k, vals in qs.items():
-                for v in vals:
-                    qs_flat.append((k, v))
-            qs_flat.insert(0, ('v', video_id))
-            new_qs = urlencode(qs_flat)
-            new_url = urlunparse(('https', 'www.youtube.com', '/watch', '', new_qs, ''))
+            new_url = f"https://www.youtube.com/watch?v={video_id}"
+            if p.query:
+                new_url += '&' + p.query
             return new_url
     except Exception:
         pass
     return url
 
+# Compiled once at import; shared by single-URL checks and batch file loading.
+# Alternatives share their "https?://" and host prefixes so the engine tries
+# them once per position instead of once per pattern.
+YOUTUBE_URL_RE = re.compile(
+    r'https?://(?:'
+    r'(?:www\.)?youtube\.com/(?:watch\?(?:v=|.*[&?]list=)[\w-]+|shorts/[\w-]+|playlist\?list=[\w-]+)'
+    r'|m\.youtube\.com/watch\?v=[\w-]+'
+    r'|youtu\.be/[\w-]+'
+    r')'
+)
+
 def is_valid_youtube_url(url: str) -> bool:
-    youtube_patterns = [
-        r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-        r'https?://(?:www\.)?youtube\.com/shorts/[\w-]+',
-        r'https?://youtu\.be/[\w-]+',
-        r'https?://m\.youtube\.com/watch\?v=[\w-]+',
-        r'https?://(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
-        r'https?://(?:www\.)?youtube\.com/watch\?.*[&?]list=[\w-]+',
-    ]
-    return any(re.search(pattern, url) for pattern in youtube_patterns)
+    return YOUTUBE_URL_RE.search(url) is not None
 
 def is_playlist_url(url: str) -> bool:
-    if 'list=' in url:
-        return True
-    playlist_patterns = [
-        r'https?://(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
-        r'https?://(?:www\.)?youtube\.com/watch\?.*[&?]list=[\w-]+',
-    ]
-    return any(re.search(pattern, url) for pattern in playlist_patterns)
+    # Every playlist URL form carries a list= parameter, so the substring
+    # test alone decides
+    return 'list=' in url
@@ -4,21 +4,195 @@ YouTube Video Downloader Agent
 Downloads YouTube videos, shorts, and playlists from provided URLs
 """
 
+import atexit
+import collections
+import contextlib
+import functools
+import json
 import sys
 import re
+import shutil
 import subprocess
+import mmap
 import os
+import queue
+import threading
 from pathlib import Path
 import argparse
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
 import yt_dlp
+from yt_dlp.postprocessor import PostProcessor
 from tqdm import tqdm
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
+# Watch, shorts, youtu.be, mobile and playlist URLs, compiled once at import
+# as one pattern sharing the scheme and host prefixes
+YOUTUBE_URL_RE = re.compile(
+    r'https?://(?:'
+    r'(?:www\.)?youtube\.com/(?:watch\?(?:v=|.*[&?]list=)[\w-]+|shorts/[\w-]+|playlist\?list=[\w-]+)'
+    r'|m\.youtube\.com/watch\?v=[\w-]+'
+    r'|youtu\.be/[\w-]+'
+    r')'
+)
+
+@functools.lru_cache(maxsize=1)
+def _default_download_path() -> Path:
+    """Resolve the OS download folder once; it doesn't change during a run"""
+    if os.name == 'nt':  # Windows
+        # Try to get Windows Downloads folder
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
+                              r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
+                downloads_path = winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0]
+                return Path(downloads_path) / "YouTube_Downloads"
+        except:
+            return Path.home() / "Downloads" / "YouTube_Downloads"
+    else:  # Linux/Mac
+        return Path.home() / "Downloads" / "YouTube_Downloads"
+
+# Options for the reusable metadata-only YoutubeDL instances, by kind of lookup
+_PROBE_YDL_OPTS = {
+    'info': {'quiet': True, 'no_warnings': True, 'socket_timeout': 30},
+    'playlist': {'quiet': True, 'no_warnings': True, 'extract_flat': 'in_playlist', 'socket_timeout': 30},
+    'formats': {'quiet': True, 'no_warnings': True, 'extractor_retries': 1, 'socket_timeout': 30},
+}
+
+# HTTP transport settings shared by single-video and playlist downloads:
+# DASH/HLS fragments are fetched 8 at a time, plain HTTP downloads in 10 MiB
+# ranges, and HTTP retries back off exponentially up to 30s
+_TRANSPORT_YDL_OPTS = {
+    'concurrent_fragment_downloads': 8,
+    'http_chunk_size': 10 * 1024 * 1024,
+    'socket_timeout': 30,
+    'retry_sleep_functions': {'http': lambda n: min(2 ** n, 30)},
+}
+
+# Last whitespace-separated token of each line in a download archive
+_ARCHIVE_ID_RE = re.compile(rb'(\S+)[ \t\r]*$', re.MULTILINE)
+
+# 11-character video ID in watch, shorts and youtu.be URLs
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/)([\w-]{11})')
+
+# Metadata cache kept in the download folder; entries older than this are refetched
+META_CACHE_FILENAME = '.yt_meta_cache.json'
+META_CACHE_TTL = 24 * 3600
+# Kinds kept until the cache is cleared: a downloaded file's name doesn't go stale
+META_CACHE_PERMANENT = frozenset({'filename'})
+
+# PATH lookups for the height-probing tools; installed tools don't change mid-run
+@functools.lru_cache(maxsize=None)
+def _which(tool: str) -> Optional[str]:
+    return shutil.which(tool)
+
+# PyAV reads container headers in-process instead of running ffprobe; it is
+# imported on the first probe so startup doesn't pay for it
+@functools.lru_cache(maxsize=None)
+def _load_av():
+    try:
+        import av
+    except ImportError:
+        return None
+    return av
+
+# Quality strings of the form '<height>p', e.g. '1080p'
+_QUALITY_RE = re.compile(r'^(\d{3,4})p$')
+
+# Only a handful of distinct quality strings occur, and playlists parse them per entry
+@functools.lru_cache(maxsize=64)
+def _quality_height(quality: str) -> Optional[int]:
+    m = _QUALITY_RE.match(quality.lower())
+    return int(m.group(1)) if m else None
+
+# Fixed format selectors for 'best' (with/without FFmpeg merging), 'worst' and audio
+BEST_SELECTOR = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best[ext=mp4]/best'
+BEST_SELECTOR_NO_FFMPEG = 'best[ext=mp4]/best'
+WORST_SELECTOR = 'worst[ext=mp4]/worst'
+AUDIO_SELECTOR = 'bestaudio/best'
+
+# Selector for a '<height>p' quality, built once per (height, ffmpeg) pair
+@functools.lru_cache(maxsize=64)
+def _height_selector(height: int, ffmpeg_available: bool) -> str:
+    if ffmpeg_available:
+        # Prefer exact height, then <= height, with merge; fall back to best
+        return (
+            f"bestvideo[height={height}][ext=mp4]+bestaudio[ext=m4a]/"
+            f"bestvideo[height={height}]+bestaudio/"
+            f"best[height={height}]/best[height<={height}]"
+        )
+    # Without FFmpeg, prefer pre-merged formats with both audio+video
+    return (
+        f"best[height={height}][vcodec!=none][acodec!=none]/"
+        f"best[height<={height}][vcodec!=none][acodec!=none]/best"
+    )
+
+# Characters not allowed in filenames, mapped to '_' in a single translate pass
+_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+# Playlist runs sanitize the same entry titles more than once
+@functools.lru_cache(maxsize=1024)
+def _sanitize_filename(filename: str) -> str:
+    return filename.translate(_SANITIZE_TABLE)[:200]  # Limit length
+
+# One display row per yt-dlp format, built once by _classify_formats
+FormatRow = collections.namedtuple('FormatRow', 'id height fps ext filesize tbr vcodec acodec')
+
+# Extensions treated as already-downloaded videos when looking for existing files
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mkv', '.webm', '.mov', '.avi'})
+
+class _QueueForMp3PP(PostProcessor):
+    """Hand each finished download to the MP3 worker as (path, archive line)."""
+
+    def __init__(self, jobs: "queue.Queue"):
+        super().__init__()
+        self._jobs = jobs
+
+    def run(self, info):
+        archive_id = f"{info.get('extractor_key', 'Youtube').lower()} {info['id']}"
+        self._jobs.put((info['filepath'], archive_id))
+        return [], info
+
 class YouTubeDownloader:
+    _MB = 1024 * 1024
+
     def __init__(self):
         self.download_path = self.get_default_download_path()
+        # Metadata lookups reuse one YoutubeDL per kind and thread instead of
+        # building a new one (extractors, HTTP pool) for every call
+        self._ydl_local = threading.local()
+        # check_ffmpeg() result and the working binary it found, probed once
+        self._ffmpeg_cache: Optional[bool] = None
+        self._ffmpeg_path: Optional[str] = None
+        # With interactive off every prompt takes its default answer, so the
+        # script can run without a TTY; format_id then replaces manual selection
+        self.interactive: bool = True
+        self.format_id: Optional[str] = None
+        # Parallel download_multiple workers take turns at the prompt; reentrant
+        # so a whole selection dialog can hold it around its _ask() calls
+        self._prompt_lock = threading.RLock()
+        # Serializes archive appends made by the MP3 conversion worker
+        self._archive_lock = threading.Lock()
+        # get_video_info/get_available_formats results by video ID, loaded
+        # from META_CACHE_FILENAME on first use and written back at exit to
+        # the file it came from (_meta_cache_file)
+        self.use_meta_cache: bool = True
+        self._meta_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._meta_cache_file: Optional[Path] = None
+        self._meta_cache_dirty = False
+        self._meta_cache_lock = threading.Lock()
+        atexit.register(self.save_meta_cache)
+        # Folder listings shared by every existing-file check in one
+        # download_multiple batch (None outside a batch: list on each check)
+        self._listing_snapshot: Optional[Dict[Path, List[Tuple[str, str]]]] = None
+        # Probed heights by (path, mtime, size): a file is probed again only
+        # after it changes
+        self._height_cache: Dict[Tuple[str, int, int], Optional[int]] = {}
+        # Download YoutubeDLs kept open for a download_multiple batch, by thread
+        # and options, so URLs with the same settings share one instance
+        self._batch_ydls: Optional[Dict[Tuple[int, str], yt_dlp.YoutubeDL]] = None
+        self._batch_ydls_lock = threading.Lock()
 
     class QuietLogger:
         def debug(self, msg):
@@ -31,31 +205,28 @@ class YouTubeDownloader:
             # Suppress noisy transient errors during format probing
             pass
         
+    def _ask(self, prompt: str, default: str = '') -> str:
+        """input() that answers `default` without prompting when not interactive"""
+        if not self.interactive:
+            return default
+        with self._prompt_lock:
+            return input(prompt).strip()
+
     def get_default_download_path(self) -> Path:
         """Get the default download path for the OS"""
-        if os.name == 'nt':  # Windows
-            # Try to get Windows Downloads folder
-            try:
-                import winreg
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
-                                  r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
-                    downloads_path = winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0]
-                    return Path(downloads_path) / "YouTube_Downloads"
-            except:
-                return Path.home() / "Downloads" / "YouTube_Downloads"
-        else:  # Linux/Mac
-            return Path.home() / "Downloads" / "YouTube_Downloads"
+        return _default_download_path()
     
     def setup_download_path(self) -> bool:
         """Ask user for download path or use default"""
         default_path = self.download_path
         print(f"Default download path: {default_path}")
         
-        choice = input("Use default path? (Y/n): ").strip().lower()
+        choice = self._ask("Use default path? (Y/n): ", 'y').lower()
         if choice in ['n', 'no']:
-            custom_path = input("Enter custom download path: ").strip()
+            custom_path = self._ask("Enter custom download path: ")
             if custom_path:
                 try:
+                    self._reset_meta_cache()
                     self.download_path = Path(custom_path)
                     self.download_path.mkdir(parents=True, exist_ok=True)
                     print(f"Download path set to: {self.download_path}")
@@ -75,16 +246,17 @@ class YouTubeDownloader:
     
     def check_ffmpeg(self) -> bool:
         """Check if FFmpeg is available"""
-        import shutil
-        
-        # First try to find ffmpeg in PATH
+        if self._ffmpeg_cache is None:
+            self._ffmpeg_path = self._find_ffmpeg()
+            self._ffmpeg_cache = self._ffmpeg_path is not None
+        return self._ffmpeg_cache
+    
+    def _find_ffmpeg(self) -> Optional[str]:
+        """Return the first executable ffmpeg binary, or None"""
+        # First try to find ffmpeg in PATH (which() only returns executables)
         ffmpeg_path = shutil.which('ffmpeg')
         if ffmpeg_path:
-            try:
-                subprocess.run([ffmpeg_path, '-version'], capture_output=True, check=True)
-                return True
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                pass
+            return ffmpeg_path
         
         # Try common FFmpeg installation paths on Windows
         common_paths = [
@@ -95,36 +267,20 @@ class YouTubeDownloader:
         ]
         
         for path in common_paths:
-            try:
-                subprocess.run([path, '-version'], capture_output=True, check=True)
-                return True
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                continue
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
         
-        return False
+        return None
     
     def is_valid_youtube_url(self, url: str) -> bool:
         """Check if the URL is a valid YouTube URL"""
-        youtube_patterns = [
-            r'https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-            r'https?://(?:www\.)?youtube\.com/shorts/[\w-]+',
-            r'https?://youtu\.be/[\w-]+',
-            r'https?://m\.youtube\.com/watch\?v=[\w-]+',
-            r'https?://(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
-            r'https?://(?:www\.)?youtube\.com/watch\?.*[&?]list=[\w-]+',
-        ]
-        return any(re.search(pattern, url) for pattern in youtube_patterns)
+        return YOUTUBE_URL_RE.search(url) is not None
     
     def is_playlist_url(self, url: str) -> bool:
         """Check if URL is a playlist"""
-        # Also treat youtu.be URLs with list= as playlist links
-        if 'list=' in url:
-            return True
-        playlist_patterns = [
-            r'https?://(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
-            r'https?://(?:www\.)?youtube\.com/watch\?.*[&?]list=[\w-]+',
-        ]
-        return any(re.search(pattern, url) for pattern in playlist_patterns)
+        # Every playlist form (youtu.be links included) carries list=,
+        # so the substring test alone decides
+        return 'list=' in url
 
     def normalize_youtube_url(self, url: str) -> str:
         """Normalize YouTube URLs (e.g., youtu.be -> youtube.com/watch?v=...). Preserve other query params."""
@@ -151,35 +307,161 @@ class YouTubeDownloader:
             pass
         return url
     
-    def get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
-        """Get video information without downloading"""
-        ydl_opts = {'quiet': True, 'no_warnings': True}
-        
-        try:
+    def _get_probe_ydl(self, kind: str, silent: bool = False) -> yt_dlp.YoutubeDL:
+        """Return this thread's reusable YoutubeDL for one kind of metadata lookup."""
+        pool = getattr(self._ydl_local, 'pool', None)
+        if pool is None:
+            pool = self._ydl_local.pool = {}
+        ydl = pool.get((kind, silent))
+        if ydl is None:
+            ydl_opts: Dict[str, Any] = dict(_PROBE_YDL_OPTS[kind])
+            if silent:
+                ydl_opts['logger'] = self.QuietLogger()
+                ydl_opts['noprogress'] = True
+            ydl = pool[(kind, silent)] = yt_dlp.YoutubeDL(ydl_opts)
+        return ydl
+
+    @property
+    def _meta_cache_path(self) -> Path:
+        return self.download_path / META_CACHE_FILENAME
+
+    def _load_meta_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Read the metadata cache file once; call with _meta_cache_lock held."""
+        if self._meta_cache is None:
+            self._meta_cache_file = self._meta_cache_path
+            try:
+                with open(self._meta_cache_file, 'r', encoding='utf-8') as fh:
+                    cache = json.load(fh)
+                self._meta_cache = cache if isinstance(cache, dict) else {}
+            except (OSError, ValueError):
+                self._meta_cache = {}
+        return self._meta_cache
+
+    def _meta_cache_get(self, url: str, kind: str) -> Any:
+        """Cached `kind` metadata for the URL's video, or None if missing or stale."""
+        if not self.use_meta_cache:
+            return None
+        m = _VIDEO_ID_RE.search(url)
+        if not m:
+            return None
+        with self._meta_cache_lock:
+            entry = self._load_meta_cache().get(m.group(1), {}).get(kind)
+        if not entry or self._meta_entry_stale(kind, entry, time.time()):
+            return None
+        return entry.get('value')
+
+    def _meta_entry_stale(self, kind: str, entry: Dict[str, Any], now: float) -> bool:
+        return kind not in META_CACHE_PERMANENT and now - entry.get('ts', 0) > META_CACHE_TTL
+
+    def _meta_cache_put(self, url: str, kind: str, value: Any) -> None:
+        if not self.use_meta_cache:
+            return
+        m = _VIDEO_ID_RE.search(url)
+        if not m:
+            return
+        with self._meta_cache_lock:
+            self._load_meta_cache().setdefault(m.group(1), {})[kind] = {'ts': time.time(), 'value': value}
+            self._meta_cache_dirty = True
+
+    def save_meta_cache(self) -> None:
+        """Write the metadata cache back if anything was added (runs at exit)."""
+        with self._meta_cache_lock:
+            if not self._meta_cache_dirty or self._meta_cache is None:
+                return
+            now = time.time()
+            cache = {vid: kinds for vid, kinds in (
+                (vid, {k: e for k, e in kinds.items() if not self._meta_entry_stale(k, e, now)})
+                for vid, kinds in self._meta_cache.items()
+            ) if kinds}
+            path = self._meta_cache_file or self._meta_cache_path
+            tmp = path.with_name(path.name + '.tmp')
+            try:
+                with open(tmp, 'w', encoding='utf-8') as fh:
+                    json.dump(cache, fh)
+                os.replace(tmp, path)
+                self._meta_cache_dirty = False
+            except OSError as e:
+                print(f"Could not save metadata cache: {e}")
+
+    def clear_meta_cache(self) -> None:
+        """Forget all cached metadata and delete the cache file."""
+        with self._meta_cache_lock:
+            self._meta_cache = {}
+            self._meta_cache_file = self._meta_cache_path
+            self._meta_cache_dirty = False
+            try:
+                self._meta_cache_file.unlink(missing_ok=True)
+            except OSError as e:
+                print(f"Could not delete metadata cache: {e}")
+
+    def _reset_meta_cache(self) -> None:
+        """Save the metadata cache and drop it, so the next use loads the one in the new download path."""
+        self.save_meta_cache()
+        with self._meta_cache_lock:
+            self._meta_cache = None
+            self._meta_cache_file = None
+            self._meta_cache_dirty = False
+
+    @contextlib.contextmanager
+    def _download_ydl(self, ydl_opts: Dict[str, Any]):
+        """Yield a YoutubeDL for ydl_opts: a fresh one, or the batch's shared one while a batch runs."""
+        if self._batch_ydls is None:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print("Analyzing video...")
-                info = ydl.extract_info(url, download=False)
-                if info is None:
-                    return None
-                return {
-                    'title': info.get('title', 'Unknown'),
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown'),
-                }
+                yield ydl
+            return
+        key = (threading.get_ident(), repr(sorted(ydl_opts.items(), key=lambda kv: kv[0])))
+        with self._batch_ydls_lock:
+            ydl = self._batch_ydls.get(key)
+            if ydl is None:
+                ydl = self._batch_ydls[key] = yt_dlp.YoutubeDL(ydl_opts)
+        yield ydl
+
+    def _close_batch_ydls(self) -> None:
+        with self._batch_ydls_lock:
+            ydls, self._batch_ydls = list((self._batch_ydls or {}).values()), None
+        for ydl in ydls:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+    def get_video_info_full(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return yt-dlp's full info dict for a video, formats included, caching both summaries."""
+        try:
+            print("Analyzing video...")
+            info = self._get_probe_ydl('info').extract_info(url, download=False)
         except Exception as e:
             print(f"Error getting video info: {str(e)}")
             return None
+        if info is not None:
+            self._meta_cache_put(url, 'info', self._summarize_video_info(info))
+            formats = self._formats_by_height(info)
+            if formats:
+                self._meta_cache_put(url, 'formats', formats)
+        return info
+
+    def _summarize_video_info(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'title': info.get('title', 'Unknown'),
+            'duration': info.get('duration', 0),
+            'uploader': info.get('uploader', 'Unknown'),
+        }
+
+    def get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get video information without downloading"""
+        cached = self._meta_cache_get(url, 'info')
+        if cached is not None:
+            return cached
+        info = self.get_video_info_full(url)
+        return self._summarize_video_info(info) if info is not None else None
     
     def get_playlist_info(self, url: str) -> Optional[Dict[str, Any]]:
         """Get playlist information"""
-        ydl_opts = {'quiet': True, 'no_warnings': True, 'extract_flat': True}
-        
         try:
             print("Analyzing playlist...")
             with tqdm(desc="Loading playlist", unit="items") as pbar:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    pbar.update(1)
+                info = self._get_probe_ydl('playlist').extract_info(url, download=False)
+                pbar.update(1)
                     
                 if info and 'entries' in info:
                     entries = list(info['entries'])
@@ -194,115 +476,115 @@ class YouTubeDownloader:
         
         return None
     
-    def get_available_formats(self, url: str, silent: bool = False) -> List[Dict[str, Any]]:
-        """Get available video formats with progress indication"""
-        ydl_opts: Dict[str, Any] = {'quiet': True, 'no_warnings': True, 'extractor_retries': 1}
-        if silent:
-            ydl_opts['logger'] = self.QuietLogger()
-            ydl_opts['noprogress'] = True
-        
+    def get_available_formats(self, url: str, silent: bool = False,
+                              info: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get available video formats with progress indication.
+        Pass the dict from get_video_info_full() as `info` to skip the extraction.
+        """
+        if info is not None:
+            return self._formats_by_height(info)
+        cached = self._meta_cache_get(url, 'formats')
+        if cached is not None:
+            return cached
         try:
             print("Getting available formats...")
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if info and 'formats' in info:
-                    formats = []
-                    seen_qualities = set()
-                    
-                    for fmt in tqdm(info['formats'], desc="Processing formats", unit="fmt"):
-                        height = fmt.get('height')
-                        if height and height not in seen_qualities:
-                            formats.append({
-                                'format_id': fmt.get('format_id'),
-                                'height': height,
-                                'ext': fmt.get('ext', 'unknown'),
-                                'filesize': fmt.get('filesize', 0),
-                                'vcodec': fmt.get('vcodec', 'none'),
-                                'acodec': fmt.get('acodec', 'none')
-                            })
-                            seen_qualities.add(height)
-                    
-                    formats.sort(key=lambda x: x['height'], reverse=True)
-                    return formats
+            info = self._get_probe_ydl('formats', silent).extract_info(url, download=False)
+            if info:
+                formats = self._formats_by_height(info)
+                if formats:
+                    self._meta_cache_put(url, 'formats', formats)
+                return formats
         except Exception as e:
             print(f"Error getting formats: {str(e)}")
         
         return []
 
+    def _formats_by_height(self, info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """One summary row per video height in a yt-dlp info dict, tallest first."""
+        # First format seen for each height
+        by_height: Dict[int, Dict[str, Any]] = {}
+        for fmt in info.get('formats') or []:
+            height = fmt.get('height')
+            if height and height not in by_height:
+                by_height[height] = fmt
+        
+        formats = [{
+            'format_id': fmt.get('format_id'),
+            'height': height,
+            'ext': fmt.get('ext', 'unknown'),
+            'filesize': fmt.get('filesize', 0),
+            'vcodec': fmt.get('vcodec', 'none'),
+            'acodec': fmt.get('acodec', 'none')
+        } for height, fmt in by_height.items()]
+        formats.sort(key=lambda x: x['height'], reverse=True)
+        return formats
+
     def _extract_all_formats(self, url: str, silent: bool = False) -> Optional[Dict[str, Any]]:
         """Return full yt-dlp info dict for URL without downloading."""
-        ydl_opts: Dict[str, Any] = {'quiet': True, 'no_warnings': True}
-        if silent:
-            ydl_opts['logger'] = self.QuietLogger()
-            ydl_opts['noprogress'] = True
+        ydl = self._get_probe_ydl('info', silent)
+        normalized = self.normalize_youtube_url(url)
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.normalize_youtube_url(url), download=False)
-                return info
+            return ydl.extract_info(normalized, download=False)
         except Exception:
             # Retry once without a "t"/start parameter if present
             try:
-                p = urlparse(url)
+                p = urlparse(normalized)
                 qs = parse_qs(p.query)
                 if 't' in qs or 'start' in qs:
                     qs.pop('t', None)
                     qs.pop('start', None)
-                    new_qs = urlencode([(k, v2) for k, v in qs.items() for v2 in (v if isinstance(v, list) else [v])])
+                    new_qs = urlencode([(k, v) for k, values in qs.items() for v in values])
                     retry_url = urlunparse((p.scheme, p.netloc, p.path, p.params, new_qs, p.fragment))
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(self.normalize_youtube_url(retry_url), download=False)
-                        return info
+                    return ydl.extract_info(retry_url, download=False)
             except Exception:
                 pass
             return None
 
-    def select_format_manually(self, url: str, ffmpeg_available: bool) -> Optional[Dict[str, Any]]:
-        """Show full format list and let the user pick exact format.
-        Returns dict: { 'selector': str, 'audio_only': bool }
-        """
-        info = self._extract_all_formats(url)
-        if not info or 'formats' not in info:
-            print("Could not retrieve format list.")
-            return None
+    def _size_str(self, filesize: Optional[float], unknown: str = '?') -> str:
+        """Format a yt-dlp filesize (int, float or None) in MB."""
+        return f"{filesize / self._MB:.1f}MB" if filesize else unknown
 
-        formats = info['formats']
-        combined = []
-        video_only = []
-        audio_only = []
+    def _classify_formats(self, formats: List[Dict[str, Any]]) -> Tuple[List[FormatRow], List[FormatRow], List[FormatRow]]:
+        """Split yt-dlp formats into (combined, video_only, audio_only) display rows, each sorted best first."""
+        combined: List[FormatRow] = []
+        video_only: List[FormatRow] = []
+        audio_only: List[FormatRow] = []
 
         for f in formats:
             v = f.get('vcodec')
             a = f.get('acodec')
-            height = f.get('height')
-            fps = f.get('fps')
-            ext = f.get('ext')
-            filesize = f.get('filesize') or f.get('filesize_approx')
-            tbr = f.get('tbr')
-            fmt_id = f.get('format_id')
-            row = {
-                'id': fmt_id,
-                'height': height,
-                'fps': fps,
-                'ext': ext,
-                'filesize': filesize,
-                'tbr': tbr,
-                'vcodec': v,
-                'acodec': a,
-            }
-            if (v and v != 'none') and (a and a != 'none'):
-                combined.append(row)
-            elif (v and v != 'none') and (not a or a == 'none'):
-                video_only.append(row)
-            elif (not v or v == 'none') and (a and a != 'none'):
-                audio_only.append(row)
+            has_video = bool(v) and v != 'none'
+            has_audio = bool(a) and a != 'none'
+            if has_video:
+                target = combined if has_audio else video_only
+            elif has_audio:
+                target = audio_only
+            else:
+                continue
+            target.append(FormatRow(
+                f.get('format_id'), f.get('height'), f.get('fps'), f.get('ext'),
+                f.get('filesize') or f.get('filesize_approx'), f.get('tbr'), v, a,
+            ))
 
         def sort_key(x):
             # sort by height desc, then tbr desc
-            return (x.get('height') or 0, x.get('tbr') or 0)
+            return (x.height or 0, x.tbr or 0)
 
         combined.sort(key=sort_key, reverse=True)
         video_only.sort(key=sort_key, reverse=True)
-        audio_only.sort(key=lambda x: (x.get('tbr') or 0, x.get('filesize') or 0), reverse=True)
+        audio_only.sort(key=lambda x: (x.tbr or 0, x.filesize or 0), reverse=True)
+        return combined, video_only, audio_only
+
+    def select_format_manually(self, url: str, ffmpeg_available: bool) -> Optional[Dict[str, Any]]:
+        """Show full format list and let the user pick exact format.
+        Returns dict: { 'selector': str, 'audio_only': bool }
+        """
+        info = self._extract_all_formats(url)
+        if not info or 'formats' not in info:
+            print("Could not retrieve format list.")
+            return None
+
+        combined, video_only, audio_only = self._classify_formats(info['formats'])
 
         print("\n0. Best available (auto)")
         idx_map: Dict[int, Dict[str, Any]] = {}
@@ -310,32 +592,29 @@ class YouTubeDownloader:
         if combined:
             print("\nCombined formats (video+audio):")
             for f in combined:
-                size_mb = (f['filesize'] or 0) / (1024*1024) if f.get('filesize') else 0
-                size_str = f"{size_mb:.1f}MB" if size_mb > 0 else "?"
-                h = f.get('height')
-                fps = f.get('fps') or ''
-                print(f"{idx}. id={f['id']} {h or '?'}p{'' if not fps else f'@{fps}fps'} {f['ext']} {size_str}")
-                idx_map[idx] = {'kind': 'combined', 'id': f['id'], 'height': h}
+                size_str = self._size_str(f.filesize)
+                h = f.height
+                fps = f.fps or ''
+                print(f"{idx}. id={f.id} {h or '?'}p{'' if not fps else f'@{fps}fps'} {f.ext} {size_str}")
+                idx_map[idx] = {'kind': 'combined', 'id': f.id, 'height': h}
                 idx += 1
         if video_only:
             print("\nVideo-only formats (no audio):")
             for f in video_only:
-                size_mb = (f['filesize'] or 0) / (1024*1024) if f.get('filesize') else 0
-                size_str = f"{size_mb:.1f}MB" if size_mb > 0 else "?"
-                h = f.get('height')
-                fps = f.get('fps') or ''
-                print(f"{idx}. id={f['id']} {h or '?'}p{'' if not fps else f'@{fps}fps'} {f['ext']} {size_str}")
-                idx_map[idx] = {'kind': 'video', 'id': f['id'], 'height': h}
+                size_str = self._size_str(f.filesize)
+                h = f.height
+                fps = f.fps or ''
+                print(f"{idx}. id={f.id} {h or '?'}p{'' if not fps else f'@{fps}fps'} {f.ext} {size_str}")
+                idx_map[idx] = {'kind': 'video', 'id': f.id, 'height': h}
                 idx += 1
         if audio_only:
             print("\nAudio-only formats:")
             for f in audio_only:
-                size_mb = (f['filesize'] or 0) / (1024*1024) if f.get('filesize') else 0
-                size_str = f"{size_mb:.1f}MB" if size_mb > 0 else "?"
-                abr = f.get('tbr')
+                size_str = self._size_str(f.filesize)
+                abr = f.tbr
                 abr_str = f"{abr}kbps" if abr else ''
-                print(f"{idx}. id={f['id']} {f['ext']} {abr_str} {size_str}")
-                idx_map[idx] = {'kind': 'audio', 'id': f['id'], 'height': None}
+                print(f"{idx}. id={f.id} {f.ext} {abr_str} {size_str}")
+                idx_map[idx] = {'kind': 'audio', 'id': f.id, 'height': None}
                 idx += 1
 
         print(f"{idx}. Audio only (auto)")
@@ -374,7 +653,45 @@ class YouTubeDownloader:
 
     def print_format_table(self, url: str) -> bool:
         """Print a full, readable format list for a video URL. Returns True on success."""
-        info = self._extract_all_formats(url)
+        return self._print_format_info(self._extract_all_formats(url))
+
+    def list_formats(self, urls: List[str], max_workers: int = 8) -> None:
+        """Print format tables for several URLs (first item of playlists).
+        Extractions run side by side; the tables are printed in input order.
+        """
+        def fetch(url: str) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+            notes: List[str] = []
+            vid_url: Optional[str] = url
+            if self.is_playlist_url(url):
+                notes.append("Note: URL is a playlist; showing formats for the first item only.")
+                plist = self.get_playlist_info(url)
+                vid_url = None
+                if plist and plist.get('entries'):
+                    entry = plist['entries'][0]
+                    vid_id = entry.get('id')
+                    if vid_id:
+                        vid_url = f"https://www.youtube.com/watch?v={vid_id}"
+                    elif entry.get('url'):
+                        vid_url = entry['url']
+                    if not vid_url:
+                        notes.append("Could not resolve first video URL from playlist.")
+                else:
+                    notes.append("Could not load playlist entries.")
+            if vid_url is None:
+                return notes, None
+            return notes, self._extract_all_formats(vid_url) or {}
+
+        # Each extraction is a network round-trip; probe YoutubeDLs are per thread
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+            for url, (notes, info) in zip(urls, executor.map(fetch, urls)):
+                print(f"\n=== Formats for: {url} ===")
+                if notes:
+                    print('\n'.join(notes))
+                if info is not None:
+                    self._print_format_info(info)
+
+    def _print_format_info(self, info: Optional[Dict[str, Any]]) -> bool:
+        """print_format_table() for an already extracted info dict."""
         if not info or 'formats' not in info:
             print("Could not retrieve format list.")
             return False
@@ -383,87 +700,69 @@ class YouTubeDownloader:
         if print_title:
             print(f"\nTitle: {print_title}")
 
-        formats = info['formats']
-        combined: List[Dict[str, Any]] = []
-        video_only: List[Dict[str, Any]] = []
-        audio_only: List[Dict[str, Any]] = []
-
-        for f in formats:
-            v = f.get('vcodec')
-            a = f.get('acodec')
-            row = {
-                'id': f.get('format_id'),
-                'height': f.get('height'),
-                'fps': f.get('fps'),
-                'ext': f.get('ext'),
-                'filesize': f.get('filesize') or f.get('filesize_approx'),
-                'tbr': f.get('tbr'),
-                'vcodec': v,
-                'acodec': a,
-            }
-            if (v and v != 'none') and (a and a != 'none'):
-                combined.append(row)
-            elif (v and v != 'none') and (not a or a == 'none'):
-                video_only.append(row)
-            elif (not v or v == 'none') and (a and a != 'none'):
-                audio_only.append(row)
-
-        def sort_key(x):
-            return (x.get('height') or 0, x.get('tbr') or 0)
-
-        combined.sort(key=sort_key, reverse=True)
-        video_only.sort(key=sort_key, reverse=True)
-        audio_only.sort(key=lambda x: (x.get('tbr') or 0, x.get('filesize') or 0), reverse=True)
-
-        def _size_str(val: Optional[int]) -> str:
-            if not val:
-                return '?'
-            try:
-                mb = float(val) / (1024 * 1024)
-                return f"{mb:.1f}MB"
-            except Exception:
-                return '?'
+        combined, video_only, audio_only = self._classify_formats(info['formats'])
 
         if combined:
             print("\nCombined (video+audio):")
             for f in combined:
-                h = f.get('height')
-                fps = f.get('fps') or ''
-                print(f"  id={f['id']}  {h or '?'}p{'' if not fps else f'@{fps}fps'}  {f['ext']}  { _size_str(f.get('filesize')) }")
+                h = f.height
+                fps = f.fps or ''
+                print(f"  id={f.id}  {h or '?'}p{'' if not fps else f'@{fps}fps'}  {f.ext}  {self._size_str(f.filesize)}")
         if video_only:
             print("\nVideo-only (requires merge for audio):")
             for f in video_only:
-                h = f.get('height')
-                fps = f.get('fps') or ''
-                print(f"  id={f['id']}  {h or '?'}p{'' if not fps else f'@{fps}fps'}  {f['ext']}  { _size_str(f.get('filesize')) }")
+                h = f.height
+                fps = f.fps or ''
+                print(f"  id={f.id}  {h or '?'}p{'' if not fps else f'@{fps}fps'}  {f.ext}  {self._size_str(f.filesize)}")
         if audio_only:
             print("\nAudio-only:")
             for f in audio_only:
-                abr = f.get('tbr')
+                abr = f.tbr
                 abr_str = f"{abr}kbps" if abr else ''
-                print(f"  id={f['id']}  {f['ext']}  {abr_str}  { _size_str(f.get('filesize')) }")
+                print(f"  id={f.id}  {f.ext}  {abr_str}  {self._size_str(f.filesize)}")
 
         return True
 
+    def _delete_files(self, paths: List[Path], max_workers: int = 16):
+        """Unlink many files at once; each unlink releases the GIL while it waits on the disk"""
+        def unlink(p: Path) -> Optional[Exception]:
+            try:
+                p.unlink(missing_ok=True)
+            except Exception as e:
+                return e
+            return None
+
+        if len(paths) <= 1:
+            errors = [unlink(p) for p in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+                errors = list(pool.map(unlink, paths))
+        for p, e in zip(paths, errors):
+            if e is not None:
+                print(f"Could not delete {p.name}: {e}")
+
     def _get_archive_path(self, playlist_folder: Path, custom_archive: Optional[str]) -> Path:
         if custom_archive:
             return Path(custom_archive)
         return playlist_folder / '.download-archive.txt'
 
     def _read_archive_ids(self, archive_path: Path) -> Set[str]:
-        ids: Set[str] = set()
+        # Lines look like "youtube <id>": scan the mapped file for each line's
+        # last token, so only the IDs themselves become Python objects
         try:
-            if archive_path.exists():
-                for line in archive_path.read_text(encoding='utf-8', errors='ignore').splitlines():
-                    parts = line.strip().split()
-                    if parts:
-                        ids.add(parts[-1])  # last token is typically the video id
+            with open(archive_path, 'rb') as fh:
+                if os.fstat(fh.fileno()).st_size == 0:
+                    return set()  # zero-length files can't be mapped
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return {m.group(1).decode('utf-8', 'ignore') for m in _ARCHIVE_ID_RE.finditer(mm)}
         except Exception:
-            pass
-        return ids
+            return set()
 
-    def get_playlist_sync_status(self, url: str, playlist_folder: Path, archive_path: Optional[Path]) -> Dict[str, Any]:
-        info = self.get_playlist_info(url)
+    def get_playlist_sync_status(self, url: str, playlist_folder: Path, archive_path: Optional[Path],
+                                 playlist_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Reuse the caller's get_playlist_info() result when given; fetching
+        # the playlist again is the heaviest request of the metadata phase
+        info = playlist_info if playlist_info is not None else self.get_playlist_info(url)
         if not info or not info.get('entries'):
             return {'total': 0, 'archive': 0, 'missing': 0}
         total = info['entry_count']
@@ -478,32 +777,42 @@ class YouTubeDownloader:
         missing = max(total - archived, 0)
         return {'total': total, 'archive': archived, 'missing': missing}
 
-    def get_playlist_available_qualities(self, url: str, sample_size: int = 3) -> List[int]:
-        """Sample the first N items of a playlist and return the union of available heights (descending)."""
-        info = self.get_playlist_info(url)
-        if not info or not info.get('entries'):
-            return []
+    def get_playlist_available_qualities(self, url: str, sample_size: int = 3,
+                                         entries: Optional[List[Dict[str, Any]]] = None) -> List[int]:
+        """Sample the first N items of a playlist and return the union of available heights (descending).
+        Pass the flat entries from an earlier get_playlist_info() call to avoid fetching the playlist again.
+        """
+        if entries is None:
+            info = self.get_playlist_info(url)
+            if not info or not info.get('entries'):
+                return []
+            entries = info['entries']
 
-        heights: Set[int] = set()
-        entries = list(info['entries'])[:sample_size]
-        for entry in entries:
+        vid_urls = []
+        for entry in entries[:sample_size]:
             vid_id = entry.get('id')
-            vid_url = None
             if vid_id:
-                vid_url = f"https://www.youtube.com/watch?v={vid_id}"
+                vid_urls.append(f"https://www.youtube.com/watch?v={vid_id}")
             elif entry.get('url'):
                 # Some extractors return full URLs
-                vid_url = entry['url']
-            if not vid_url:
-                continue
+                vid_urls.append(entry['url'])
+        if not vid_urls:
+            return []
+
+        def probe(vid_url: str) -> List[Dict[str, Any]]:
             try:
-                fmts = self.get_available_formats(vid_url, silent=True)
+                return self.get_available_formats(vid_url, silent=True)
+            except Exception:
+                return []
+
+        # Each probe is a network round-trip, so run them side by side
+        heights: Set[int] = set()
+        with ThreadPoolExecutor(max_workers=len(vid_urls)) as executor:
+            for fmts in executor.map(probe, vid_urls):
                 for f in fmts:
                     h = f.get('height')
                     if isinstance(h, int):
                         heights.add(h)
-            except Exception:
-                continue
 
         return sorted(heights, reverse=True)
     
@@ -519,8 +828,7 @@ class YouTubeDownloader:
         print("0. Best available (auto)")
         
         for i, fmt in enumerate(formats, 1):
-            size_mb = fmt['filesize'] / (1024 * 1024) if fmt['filesize'] else 0
-            size_str = f"{size_mb:.1f}MB" if size_mb > 0 else "Unknown size"
+            size_str = self._size_str(fmt['filesize'], "Unknown size")
             print(f"{i}. {fmt['height']}p ({fmt['ext']}) - {size_str}")
         
         print(f"{len(formats) + 1}. Audio only (MP3)")
@@ -548,8 +856,9 @@ class YouTubeDownloader:
     def download_playlist(self, url: str, quality: str = 'best', audio_only: bool = False, 
                          output_format: str = 'mp4', manual_select: bool = False,
                          use_archive: bool = True, archive_file: Optional[str] = None,
-                         append_id: bool = False, retries: int = 10, fragment_retries: int = 10) -> bool:
-        """Download entire YouTube playlist"""
+                         append_id: bool = False, retries: int = 10, fragment_retries: int = 10,
+                         concurrent: int = 1) -> bool:
+        """Download entire YouTube playlist (`concurrent` videos at a time)"""
         
         if not self.is_playlist_url(url):
             print("Error: URL is not a valid playlist")
@@ -566,7 +875,7 @@ class YouTubeDownloader:
         print(f"Videos: {playlist_info['entry_count']}")
         
         # Ask for confirmation
-        proceed = input(f"\nDownload {playlist_info['entry_count']} videos? (y/N): ").lower().startswith('y')
+        proceed = self._ask(f"\nDownload {playlist_info['entry_count']} videos? (y/N): ", 'y').lower().startswith('y')
         if not proceed:
             print("Playlist download cancelled.")
             return False
@@ -575,48 +884,53 @@ class YouTubeDownloader:
         selected_quality = quality
         selected_audio_only = audio_only
         
-        if manual_select:
-            print("\nFor playlist downloads, you can:")
-            print("1. Use the same quality for all videos")
-            print("2. Let yt-dlp choose the best available for each video")
-
-            choice = input("Choose option (1/2): ").strip()
-            if choice == '1':
-                print("\nDetecting available qualities across the playlist (sampling a few videos)...")
-                heights = self.get_playlist_available_qualities(url)
-                if not heights:
-                    print("Could not detect playlist qualities. Falling back to 'best'.")
-                    selected_quality = 'best'
+        if manual_select and not self.interactive:
+            print(f"Non-interactive mode: skipping manual selection, using {self.format_id or quality}")
+        elif manual_select:
+            # Hold the prompt for the whole dialog so parallel downloads
+            # can't interleave their menus and answers
+            with self._prompt_lock:
+                print("\nFor playlist downloads, you can:")
+                print("1. Use the same quality for all videos")
+                print("2. Let yt-dlp choose the best available for each video")
+
+                choice = input("Choose option (1/2): ").strip()
+                if choice == '1':
+                    print("\nDetecting available qualities across the playlist (sampling a few videos)...")
+                    heights = self.get_playlist_available_qualities(url, entries=playlist_info['entries'])
+                    if not heights:
+                        print("Could not detect playlist qualities. Falling back to 'best'.")
+                        selected_quality = 'best'
+                    else:
+                        print("\nSelect quality to use for all videos:")
+                        print("0. Best available")
+                        for idx, h in enumerate(heights, start=1):
+                            print(f"{idx}. {h}p")
+                        audio_idx = len(heights) + 1
+                        print(f"{audio_idx}. Audio only (MP3)")
+
+                        while True:
+                            quality_choice = input(f"Select (0-{audio_idx}): ").strip()
+                            try:
+                                qn = int(quality_choice)
+                            except ValueError:
+                                print("Enter a number from the list.")
+                                continue
+
+                            if qn == 0:
+                                selected_quality = 'best'
+                                break
+                            elif qn == audio_idx:
+                                selected_audio_only = True
+                                selected_quality = 'best'
+                                break
+                            elif 1 <= qn <= len(heights):
+                                selected_quality = f"{heights[qn-1]}p"
+                                break
+                            else:
+                                print("Invalid choice. Try again.")
                 else:
-                    print("\nSelect quality to use for all videos:")
-                    print("0. Best available")
-                    for idx, h in enumerate(heights, start=1):
-                        print(f"{idx}. {h}p")
-                    audio_idx = len(heights) + 1
-                    print(f"{audio_idx}. Audio only (MP3)")
-
-                    while True:
-                        quality_choice = input(f"Select (0-{audio_idx}): ").strip()
-                        try:
-                            qn = int(quality_choice)
-                        except ValueError:
-                            print("Enter a number from the list.")
-                            continue
-
-                        if qn == 0:
-                            selected_quality = 'best'
-                            break
-                        elif qn == audio_idx:
-                            selected_audio_only = True
-                            selected_quality = 'best'
-                            break
-                        elif 1 <= qn <= len(heights):
-                            selected_quality = f"{heights[qn-1]}p"
-                            break
-                        else:
-                            print("Invalid choice. Try again.")
-            else:
-                selected_quality = 'best'  # Let yt-dlp choose best for each video
+                    selected_quality = 'best'  # Let yt-dlp choose best for each video
         
         # Create playlist folder
         playlist_folder = self.download_path / self.sanitize_filename(playlist_info['title'])
@@ -625,7 +939,7 @@ class YouTubeDownloader:
         # Archive/resume status
         archive_path = self._get_archive_path(playlist_folder, archive_file) if use_archive else None
         if archive_path:
-            status = self.get_playlist_sync_status(url, playlist_folder, archive_path)
+            status = self.get_playlist_sync_status(url, playlist_folder, archive_path, playlist_info)
             if status['total']:
                 print(f"Sync status: {status['archive']} downloaded, {status['missing']} remaining, total {status['total']}")
         
@@ -634,11 +948,13 @@ class YouTubeDownloader:
         if requested_height and not selected_audio_only:
             to_delete = []
             # Build a map of existing files that are below requested height
-            for entry in playlist_info.get('entries', []):
+            # (the folder is listed once, not once per entry)
+            listing = self._list_video_files(playlist_folder)
+            for entry in playlist_info.get('entries', []) if listing else []:
                 title = entry.get('title') or entry.get('id') or ''
                 if not title:
                     continue
-                files = self._find_existing_by_title(playlist_folder, self.sanitize_filename(title))
+                files = self._find_existing_by_title(playlist_folder, self.sanitize_filename(title), listing)
                 if not files:
                     continue
                 existing_height = self._best_local_height(files)
@@ -650,15 +966,11 @@ class YouTubeDownloader:
                 preview = [p.name for p in to_delete[:5]]
                 if preview:
                     print("Examples:", ", ".join(preview))
-                if input("Delete and re-download higher quality? (y/N): ").lower().startswith('y'):
-                    for p in to_delete:
-                        try:
-                            p.unlink(missing_ok=True)
-                        except Exception as e:
-                            print(f"Could not delete {p.name}: {e}")
+                if self._ask("Delete and re-download higher quality? (y/N): ", 'n').lower().startswith('y'):
+                    self._delete_files(to_delete)
 
         # Configure download options for playlist
-        format_selector = self._get_format_selector(selected_quality, selected_audio_only, self.check_ffmpeg())
+        format_selector = self.format_id or self._get_format_selector(selected_quality, selected_audio_only, self.check_ffmpeg())
         print(f"Using format selector: {format_selector}")
         
         outtmpl = '%(playlist_index)s - %(title)s.%(ext)s'
@@ -676,23 +988,55 @@ class YouTubeDownloader:
             'retries': retries,
             'fragment_retries': fragment_retries,
             'overwrites': False,
+            **_TRANSPORT_YDL_OPTS,
         }
         if archive_path:
             ydl_opts['download_archive'] = str(archive_path)
         
+        audio_jobs: Optional[queue.Queue] = None
+        audio_worker: Optional[threading.Thread] = None
         if selected_audio_only:
-            ydl_opts['postprocessors'] = [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }]
+            if self.check_ffmpeg():
+                # Convert each finished download to MP3 on a worker thread, so the
+                # next video downloads while ffmpeg encodes this one. yt-dlp would
+                # archive a video before its conversion ran, so the worker writes
+                # the archive line itself once ffmpeg succeeds; archived videos
+                # are skipped through match_filter instead
+                audio_jobs = queue.Queue()
+                audio_worker = threading.Thread(target=self._convert_audio_worker,
+                                                args=(audio_jobs, archive_path), daemon=True)
+                audio_worker.start()
+                if archive_path:
+                    del ydl_opts['download_archive']
+                    archived = self._read_archive_ids(archive_path)
+
+                    def skip_archived(info, incomplete=False):
+                        if info.get('id') in archived:
+                            return f"{info.get('title') or info.get('id')} has already been recorded in the archive"
+                        return None
+
+                    ydl_opts['match_filter'] = skip_archived
+            else:
+                ydl_opts['postprocessors'] = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                    'preferredquality': '192',
+                }]
         
         print(f"\nDownloading to: {playlist_folder}")
         print("Starting playlist download...\n")
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+            if concurrent > 1:
+                failed = self._download_entries_concurrently(playlist_info['entries'], ydl_opts, concurrent,
+                                                             audio_jobs)
+                if failed:
+                    print(f"\n{len(failed)} video(s) failed:")
+                    for vid_url in failed:
+                        print(f"  {vid_url}")
+            else:
+                with self._playlist_ydl(ydl_opts, audio_jobs) as ydl:
+                    ydl.download([url])
             
             print(f"\nPlaylist download completed!")
             print(f"Downloaded to: {playlist_folder}")
@@ -701,35 +1045,102 @@ class YouTubeDownloader:
         except Exception as e:
             print(f"Playlist download error: {str(e)}")
             return False
+        
+        finally:
+            if audio_worker is not None:
+                print("Finishing MP3 conversion...")
+                audio_jobs.put(None)
+                audio_worker.join()
+
+    def _playlist_ydl(self, ydl_opts: Dict[str, Any], audio_jobs: Optional[queue.Queue]) -> yt_dlp.YoutubeDL:
+        """YoutubeDL for playlist downloads, feeding audio_jobs (if given) after each file is moved."""
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        if audio_jobs is not None:
+            ydl.add_post_processor(_QueueForMp3PP(audio_jobs), when='after_move')
+        return ydl
+
+    def _download_entries_concurrently(self, entries: List[Dict[str, Any]], ydl_opts: Dict[str, Any],
+                                       workers: int, audio_jobs: Optional[queue.Queue] = None) -> List[str]:
+        """Download playlist entries on `workers` threads, one YoutubeDL each. Returns the URLs that failed."""
+        width = len(str(len(entries)))
+        jobs = []
+        for index, entry in enumerate(entries, 1):
+            vid_id = entry.get('id')
+            vid_url = f"https://www.youtube.com/watch?v={vid_id}" if vid_id else entry.get('url')
+            if not vid_url:
+                continue
+            opts = dict(ydl_opts)
+            # Entries are downloaded as single videos, which have no playlist_index,
+            # so write each one's position into the template as text
+            opts['outtmpl'] = ydl_opts['outtmpl'].replace('%(playlist_index)s', f"{index:0{width}d}")
+            jobs.append((vid_url, opts))
+
+        def download(job) -> bool:
+            vid_url, opts = job
+            try:
+                with self._playlist_ydl(opts, audio_jobs) as ydl:
+                    return ydl.download([vid_url]) == 0
+            except Exception as e:
+                print(f"Download error for {vid_url}: {str(e)}")
+                return False
+
+        # All workers share the download archive; yt-dlp locks it for each append
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(download, jobs))
+        return [vid_url for (vid_url, _), ok in zip(jobs, results) if not ok]
 
-    def verify_download_quality(self, file_path: str, expected_quality: str) -> None:
-        """Verify the quality of downloaded video"""
+    def _convert_audio_worker(self, jobs: "queue.Queue[Optional[Tuple[str, str]]]",
+                              archive_path: Optional[Path] = None) -> None:
+        """Convert downloaded files to 192 kbps MP3 until a None job arrives.
+        A video's archive line is appended only after its conversion succeeds.
+        """
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            path, archive_id = job
+            try:
+                src = Path(path)
+                if src.suffix.lower() != '.mp3':
+                    dst = src.with_suffix('.mp3')
+                    result = subprocess.run(
+                        [self._ffmpeg_path, '-y', '-loglevel', 'error', '-i', str(src),
+                         '-vn', '-c:a', 'libmp3lame', '-b:a', '192k', str(dst)],
+                        capture_output=True, text=True
+                    )
+                    if result.returncode != 0:
+                        print(f"MP3 conversion failed for {src.name}: {result.stderr.strip()}")
+                        continue
+                    src.unlink(missing_ok=True)
+                if archive_path:
+                    with self._archive_lock:
+                        with open(archive_path, 'a', encoding='utf-8') as fh:
+                            fh.write(archive_id + '\n')
+            except Exception as e:
+                print(f"MP3 conversion failed for {Path(path).name}: {e}")
+
+    def verify_download_quality(self, file_path: str, expected_quality: str,
+                                height: Optional[int] = None) -> None:
+        """Verify the quality of downloaded video (`height` as reported by yt-dlp, else probed locally)"""
         try:
-            import json
-            # Use yt-dlp to get info about the downloaded file
-            result = subprocess.run([
-                'yt-dlp', '--print', 'resolution,filesize', '--no-download', file_path
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                info = result.stdout.strip().split('\n')
-                if info:
-                    resolution = info[0] if len(info) > 0 else "Unknown"
-                    print(f"✓ Downloaded resolution: {resolution}")
-                    if expected_quality != 'best' and expected_quality != 'worst':
-                        expected_height = int(expected_quality.replace('p', ''))
-                        if 'x' in resolution:
-                            actual_height = int(resolution.split('x')[1])
-                            if actual_height < expected_height:
-                                print(f"⚠ Warning: Expected {expected_quality} but got {actual_height}p")
-                                print("This might happen if the video is not available in the requested quality")
+            if height is None:
+                height = self._get_local_height(Path(file_path))
+            if not height:
+                return
+            print(f"✓ Downloaded resolution: {height}p")
+            expected_height = self._parse_quality_height(expected_quality)
+            if expected_height and height < expected_height:
+                print(f"⚠ Warning: Expected {expected_quality} but got {height}p")
+                print("This might happen if the video is not available in the requested quality")
         except Exception as e:
             print(f"Could not verify download quality: {str(e)}")
 
     def download_video(self, url: str, quality: str = 'best', audio_only: bool = False, 
                       output_format: str = 'mp4', manual_select: bool = False,
-                      retries: int = 10, fragment_retries: int = 10) -> bool:
-        """Download video from YouTube URL"""
+                      retries: int = 10, fragment_retries: int = 10,
+                      use_archive: bool = True, archive_file: Optional[str] = None,
+                      append_id: bool = False, concurrent: int = 1) -> bool:
+        """Download video from YouTube URL (archive, id and concurrency options apply to playlists)"""
         
         if not self.is_valid_youtube_url(url):
             print(f"Invalid YouTube URL: {url}")
@@ -737,42 +1148,62 @@ class YouTubeDownloader:
         
         # Check if it's a playlist
         if self.is_playlist_url(url):
-            return self.download_playlist(url, quality, audio_only, output_format, manual_select)
+            return self.download_playlist(url, quality, audio_only, output_format, manual_select,
+                                          use_archive=use_archive, archive_file=archive_file,
+                                          append_id=append_id, retries=retries,
+                                          fragment_retries=fragment_retries, concurrent=concurrent)
+        
+        # A video this script downloaded before is found by its remembered file
+        # name, so the "already have it" case needs no network round-trip
+        if not audio_only and not manual_select and self._skip_known_download(url, quality):
+            return True
         
-        # Get video info
-        info = self.get_video_info(url)
+        # Get video info; a cache miss fetches the full info dict once, and its
+        # formats serve the availability checks below
+        full_info: Optional[Dict[str, Any]] = None
+        info = self._meta_cache_get(url, 'info')
+        if info is None:
+            full_info = self.get_video_info_full(url)
+            info = self._summarize_video_info(full_info) if full_info else None
         if info:
-            print(f"Title: {info['title']}")
-            print(f"Uploader: {info['uploader']}")
+            # Status blocks are written with one print each, which also keeps
+            # them in one piece when download_multiple runs URLs in parallel
+            lines = [f"Title: {info['title']}", f"Uploader: {info['uploader']}"]
             if info['duration']:
                 minutes, seconds = divmod(info['duration'], 60)
-                print(f"Duration: {minutes}:{seconds:02d}")
+                lines.append(f"Duration: {minutes}:{seconds:02d}")
+            print('\n'.join(lines))
         
         # Manual selection flow (quality or exact format) for single videos
-        custom_selector: Optional[str] = None
-        if manual_select and not self.is_playlist_url(url):
-            ffmpeg_available = self.check_ffmpeg()
-            print("\nSelection mode:")
-            print("1. Choose by quality (height)")
-            print("2. Choose exact file format (advanced)")
-            mode = input("Select (1/2): ").strip()
-            if mode == '2':
-                picked = self.select_format_manually(url, ffmpeg_available)
-                if not picked:
-                    return False
-                custom_selector = picked['selector']
-                audio_only = bool(picked.get('audio_only'))
-                # When exact selector chosen, keep quality as 'best' for downstream logs
-                quality = 'best'
-            else:
-                selected_quality = self.select_quality_manually(url)
-                if selected_quality is None:
-                    return False
-                elif selected_quality == 'audio_only':
-                    audio_only = True
+        custom_selector: Optional[str] = self.format_id
+        if manual_select and not self.interactive:
+            print(f"Non-interactive mode: skipping manual selection, using {self.format_id or quality}")
+        elif manual_select:
+            # Hold the prompt for the whole dialog so parallel downloads
+            # can't interleave their menus and answers
+            with self._prompt_lock:
+                ffmpeg_available = self.check_ffmpeg()
+                print("\nSelection mode:")
+                print("1. Choose by quality (height)")
+                print("2. Choose exact file format (advanced)")
+                mode = input("Select (1/2): ").strip()
+                if mode == '2':
+                    picked = self.select_format_manually(url, ffmpeg_available)
+                    if not picked:
+                        return False
+                    custom_selector = picked['selector']
+                    audio_only = bool(picked.get('audio_only'))
+                    # When exact selector chosen, keep quality as 'best' for downstream logs
                     quality = 'best'
                 else:
-                    quality = selected_quality
+                    selected_quality = self.select_quality_manually(url)
+                    if selected_quality is None:
+                        return False
+                    elif selected_quality == 'audio_only':
+                        audio_only = True
+                        quality = 'best'
+                    else:
+                        quality = selected_quality
 
         # Check for existing local file and offer upgrade/skip
         if info and not audio_only:
@@ -787,12 +1218,12 @@ class YouTubeDownloader:
                     # If requesting 'best', try to detect remote max
                     remote_max = None
                     if requested_height is None:
-                        fmts = self.get_available_formats(url)
+                        fmts = self.get_available_formats(url, info=full_info)
                         if fmts:
                             remote_max = max((f.get('height') or 0) for f in fmts)
                     disp_existing = f"{existing_height}p" if existing_height else "unknown quality"
                     disp_target = f"{requested_height}p" if requested_height else (f"best ({remote_max}p)" if remote_max else "best")
-                    choice = input(f"Found existing file at {disp_existing}. Replace with {disp_target}? (y/N): ").strip().lower()
+                    choice = self._ask(f"Found existing file at {disp_existing}. Replace with {disp_target}? (y/N): ", 'n').lower()
                     if choice.startswith('y'):
                         for p in existing_files:
                             try:
@@ -806,23 +1237,26 @@ class YouTubeDownloader:
         # Check FFmpeg for high quality downloads
         ffmpeg_available = self.check_ffmpeg()
         if not ffmpeg_available:
-            print("⚠ Warning: FFmpeg not found!")
-            print("  - High-quality downloads may not work properly")
-            print("  - Video and audio might be downloaded as separate files")
-            print("  - Consider installing FFmpeg for better results")
+            lines = [
+                "⚠ Warning: FFmpeg not found!",
+                "  - High-quality downloads may not work properly",
+                "  - Video and audio might be downloaded as separate files",
+                "  - Consider installing FFmpeg for better results",
+            ]
             if quality in ['2160p', '4k', '1440p', '1080p']:
-                print(f"  - Requested {quality} may fallback to lower quality without FFmpeg")
+                lines.append(f"  - Requested {quality} may fallback to lower quality without FFmpeg")
         else:
-            print("✓ FFmpeg detected - high quality downloads available")
+            lines = ["✓ FFmpeg detected - high quality downloads available"]
 
         # Configure download options
         format_selector = custom_selector or self._get_format_selector(quality, audio_only, ffmpeg_available)
-        print(f"Using format selector: {format_selector}")
-        print(f"Target quality: {quality}")
+        lines.append(f"Using format selector: {format_selector}")
+        lines.append(f"Target quality: {quality}")
+        print('\n'.join(lines))
         if not audio_only and custom_selector is None:
             print("Checking available formats for this video...")
             # Show available formats for the specific quality
-            available_formats = self.get_available_formats(url)
+            available_formats = self.get_available_formats(url, info=full_info)
             if available_formats:
                 requested_height_check: Optional[int] = None
                 if quality.endswith('p') and quality != 'best' and quality != 'worst':
@@ -854,6 +1288,7 @@ class YouTubeDownloader:
             'retries': retries,
             'fragment_retries': fragment_retries,
             'overwrites': False,
+            **_TRANSPORT_YDL_OPTS,
         }
 
         if audio_only:
@@ -866,150 +1301,245 @@ class YouTubeDownloader:
         print("Starting download...")
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+            with self._download_ydl(ydl_opts) as ydl:
+                # extract_info(download=True) hands back the resolved format, so
+                # the result can be checked without probing the file again
+                result = ydl.extract_info(url, download=True)
                 print(f"Successfully downloaded: {info['title'] if info else 'Video'}")
 
                 # Try to verify the quality of the downloaded file
-                if not audio_only and quality != 'best' and quality != 'worst':
+                if not audio_only and quality != 'best' and quality != 'worst' and result:
                     print("Verifying download quality...")
-                    if info:
-                        expected_filename = self.sanitize_filename(info['title']) + '.' + output_format
-                        file_path = self.download_path / expected_filename
-                        if file_path.exists():
-                            self.verify_download_quality(str(file_path), quality)
+                    downloaded = (result.get('requested_downloads') or [{}])[0]
+                    file_path = downloaded.get('filepath')
+                    height = downloaded.get('height') or result.get('height')
+                    if height or (file_path and os.path.exists(file_path)):
+                        self.verify_download_quality(file_path or '', quality, height)
+
+                if not audio_only and result:
+                    file_path = (result.get('requested_downloads') or [{}])[0].get('filepath')
+                    if file_path and Path(file_path).suffix.lower() in VIDEO_EXTENSIONS:
+                        self._meta_cache_put(url, 'filename', Path(file_path).stem)
 
                 return True
         except Exception as e:
             print(f"Download failed: {str(e)}")
             return False
 
+    def _skip_known_download(self, url: str, quality: str) -> bool:
+        """True if a file from an earlier download of this URL already satisfies `quality`."""
+        stem = self._meta_cache_get(url, 'filename')
+        if not stem:
+            return False
+        existing_files = self._find_existing_by_title(self.download_path, stem)
+        if not existing_files:
+            return False
+        requested_height = self._parse_quality_height(quality)
+        existing_height = self._best_local_height(existing_files)
+        if requested_height:
+            if existing_height and existing_height >= requested_height:
+                print(f"Found existing '{existing_files[0].name}' at {existing_height}p which meets/exceeds requested {requested_height}p. Skipping.")
+                return True
+            return False
+        disp_existing = f"{existing_height}p" if existing_height else "unknown quality"
+        choice = self._ask(f"Found existing '{existing_files[0].name}' at {disp_existing}. Check for a better version? (y/N): ", 'n').lower()
+        if choice.startswith('y'):
+            return False
+        print("Keeping existing file; skipping download.")
+        return True
+
     def _parse_quality_height(self, quality: str) -> Optional[int]:
         """Parse a quality string like '1080p' to integer height; return None for best/worst/invalid."""
         if not quality:
             return None
-        q = quality.lower()
-        if q in ('best', 'worst'):
-            return None
-        m = re.match(r'^(\d{3,4})p$', q)
-        return int(m.group(1)) if m else None
+        return _quality_height(quality)
 
-    def _get_local_height(self, file_path: Path) -> Optional[int]:
-        """Return video height using ffprobe or mediainfo; None if unavailable/unknown."""
-        try:
-            # ffprobe
-            result = subprocess.run(
-                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', str(file_path)],
-                capture_output=True, text=True, check=True
-            )
-            import json as _json
-            data = _json.loads(result.stdout)
-            for stream in data.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    return int(stream.get('height') or 0) or None
-        except Exception:
-            pass
+    def _get_local_height(self, file_path: Union[str, Path]) -> Optional[int]:
+        """Return video height using PyAV, ffprobe or mediainfo; None if unavailable/unknown."""
+        file_path = os.fspath(file_path)
         try:
-            # mediainfo
-            result = subprocess.run(
-                ['mediainfo', '--Output=JSON', str(file_path)],
-                capture_output=True, text=True, check=True
-            )
-            import json as _json
-            data = _json.loads(result.stdout)
-            tracks = data.get('media', {}).get('track', [])
-            for track in tracks:
-                if track.get('@type') == 'Video':
-                    h = track.get('Height')
-                    try:
-                        return int(h) if h is not None else None
-                    except Exception:
-                        return None
-        except Exception:
-            pass
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        key = (file_path, st.st_mtime_ns, st.st_size)
+        if key in self._height_cache:
+            return self._height_cache[key]
+        height = self._height_cache[key] = self._probe_local_height(file_path)
+        return height
+
+    def _probe_local_height(self, file_path: str) -> Optional[int]:
+        """_get_local_height() without the cache."""
+        av = _load_av()
+        if av is not None:
+            try:
+                with av.open(file_path) as container:
+                    if container.streams.video:
+                        return container.streams.video[0].codec_context.height or None
+                return None
+            except Exception:
+                pass  # unreadable by PyAV; let the external tools try
+        ffprobe = _which('ffprobe')
+        if ffprobe:
+            try:
+                # Ask for just the first video stream's height, so the output
+                # is a few bytes instead of every stream's full JSON
+                result = subprocess.run(
+                    [ffprobe, '-v', 'error', '-select_streams', 'v:0',
+                     '-show_entries', 'stream=height', '-of', 'csv=p=0', file_path],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True, bufsize=65536
+                )
+                height = result.stdout.strip().split(',')[0]
+                if height:
+                    return int(height) or None
+            except Exception:
+                pass
+        mediainfo = _which('mediainfo')
+        if mediainfo:
+            try:
+                # Same, via an Inform template for the video track height
+                result = subprocess.run(
+                    [mediainfo, '--Inform=Video;%Height%\\n', file_path],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True, bufsize=65536
+                )
+                height = result.stdout.strip().split('\n')[0]
+                return int(height) if height else None
+            except Exception:
+                pass
         return None
 
     def _best_local_height(self, files: List[Path]) -> Optional[int]:
         """Return the maximum height among given files."""
-        heights = []
-        for f in files:
-            if f.suffix.lower() == '.part':
-                continue
-            h = self._get_local_height(f)
-            if h:
-                heights.append(h)
+        files = [f for f in files if f.suffix.lower() != '.part']
+        if len(files) > 1:
+            # Each probe mostly waits on disk or a child process
+            with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+                heights = [h for h in executor.map(self._get_local_height, files) if h]
+        else:
+            heights = [h for h in map(self._get_local_height, files) if h]
         return max(heights) if heights else None
 
-    def _find_existing_by_title(self, folder: Path, sanitized_title: str) -> List[Path]:
-        """Find files in folder whose names contain the sanitized title; filter known video extensions."""
-        exts = ['.mp4', '.mkv', '.webm', '.mov', '.avi']
-        matches: List[Path] = []
+    def _list_video_files(self, folder: Path) -> List[Tuple[str, str]]:
+        """List (stem, path string) for the video files in folder, in one directory scan."""
+        files: List[Tuple[str, str]] = []
         try:
-            for ext in exts:
-                matches.extend(folder.glob(f"*{sanitized_title}*{ext}"))
-        except Exception:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() in VIDEO_EXTENSIONS and not entry.name.startswith('.') and entry.is_file():
+                        files.append((stem, entry.path))
+        except OSError:
             pass
-        # filter out temp/incomplete
-        return [m for m in matches if not m.name.endswith('.part')]
+        return files
+
+    def _find_existing_by_title(self, folder: Path, sanitized_title: str,
+                                listing: Optional[List[Tuple[str, str]]] = None) -> List[Path]:
+        """Find files in folder whose names contain the sanitized title; filter known video extensions.
+        Pass a listing from _list_video_files() to reuse one scan across many titles.
+        """
+        if listing is None:
+            listing = self._snapshot_video_files(folder)
+        # Listings hold plain strings; only the matches become Path objects
+        return [Path(path) for stem, path in listing if sanitized_title in stem]
+
+    def _snapshot_video_files(self, folder: Path) -> List[Tuple[str, str]]:
+        """_list_video_files(), scanned once per folder while a batch snapshot is active."""
+        snapshot = self._listing_snapshot
+        if snapshot is None:
+            return self._list_video_files(folder)
+        listing = snapshot.get(folder)
+        if listing is None:
+            listing = snapshot[folder] = self._list_video_files(folder)
+        return listing
     
     def _get_format_selector(self, quality: str, audio_only: bool, ffmpeg_available: bool = True) -> str:
         """Get format selector based on preferences. Supports 'best'/'worst' or '<height>p' (e.g., '1440p')."""
         if audio_only:
-            return 'bestaudio/best'
+            return AUDIO_SELECTOR
 
         q = (quality or '').lower()
         if q in ('best', ''):
-            return 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/bestvideo+bestaudio/best[ext=mp4]/best' if ffmpeg_available else 'best[ext=mp4]/best'
+            return BEST_SELECTOR if ffmpeg_available else BEST_SELECTOR_NO_FFMPEG
         if q == 'worst':
-            return 'worst[ext=mp4]/worst'
+            return WORST_SELECTOR
 
         # Parse dynamic height like '1080p'
-        match = re.match(r'^(\d{3,4})p$', q)
-        if match:
-            height = int(match.group(1))
-            if ffmpeg_available:
-                # Prefer exact height, then <= height, with merge; fall back to best
-                return (
-                    f"bestvideo[height={height}][ext=mp4]+bestaudio[ext=m4a]/"
-                    f"bestvideo[height={height}]+bestaudio/"
-                    f"best[height={height}]/best[height<={height}]"
-                )
-            else:
-                # Without FFmpeg, prefer pre-merged formats with both audio+video
-                return (
-                    f"best[height={height}][vcodec!=none][acodec!=none]/"
-                    f"best[height<={height}][vcodec!=none][acodec!=none]/best"
-                )
+        height = _quality_height(q)
+        if height:
+            return _height_selector(height, bool(ffmpeg_available))
 
         # Unknown format string, fall back to best
-        return 'best[ext=mp4]/best'
+        return BEST_SELECTOR_NO_FFMPEG
     
-    def download_multiple(self, urls: List[str], **kwargs) -> None:
-        """Download multiple videos/playlists"""
-        successful = failed = 0
+    def download_multiple(self, urls: List[str], max_workers: int = 1, **kwargs) -> None:
+        """Download multiple videos/playlists, `max_workers` URLs at a time"""
+        # Classify the batch once: invalid URLs are reported here and never
+        # reach a worker
+        valid_urls = []
+        invalid = 0
+        for url in urls:
+            url = url.strip()
+            if self.is_valid_youtube_url(url):
+                valid_urls.append(url)
+            else:
+                print(f"Invalid YouTube URL: {url}")
+                invalid += 1
+        urls = valid_urls
+        
+        # Existing-file checks look for files from before the batch, so one
+        # listing per folder taken at first use serves every URL
+        self._listing_snapshot = {}
+        # Videos with the same settings are downloaded through one YoutubeDL
+        # per worker, so extractors and cookies are set up once per batch
+        self._batch_ydls = {}
+        try:
+            successful, failed = self._download_batch(urls, max_workers, **kwargs)
+        finally:
+            self._listing_snapshot = None
+            self._close_batch_ydls()
         
-        for i, url in enumerate(urls, 1):
-            print(f"\n{'='*60}")
-            print(f"Processing {i}/{len(urls)}")
-            print(f"{'='*60}")
+        print(f"\nSummary: {successful} successful, {failed + invalid} failed")
+
+    def _download_batch(self, urls: List[str], max_workers: int, **kwargs) -> Tuple[int, int]:
+        """download_multiple's loop; returns (successful, failed)."""
+        results: List[bool] = []
+        
+        if max_workers <= 1 or len(urls) <= 1:
+            for i, url in enumerate(urls, 1):
+                print(f"\n{'='*60}")
+                print(f"Processing {i}/{len(urls)}")
+                print(f"{'='*60}")
+                
+                results.append(bool(self.download_video(url, **kwargs)))
+        else:
+            print(f"\nProcessing {len(urls)} URLs, {max_workers} at a time")
             
-            if self.download_video(url.strip(), **kwargs):
-                successful += 1
-            else:
-                failed += 1
+            def download(url: str) -> bool:
+                try:
+                    return bool(self.download_video(url, **kwargs))
+                except Exception as e:
+                    print(f"Download error for {url}: {str(e)}")
+                    return False
+            
+            # Downloads are network-bound, so threads overlap them despite the GIL.
+            # Workers only return a result; the tally happens once at the end
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+                futures = {executor.submit(download, url): url for url in urls}
+                for done, future in enumerate(as_completed(futures), 1):
+                    ok = future.result()
+                    print(f"[{done}/{len(urls)}] {'Done' if ok else 'Failed'}: {futures[future]}")
+                    results.append(ok)
         
-        print(f"\nSummary: {successful} successful, {failed} failed")
+        successful = sum(results)
+        return successful, len(results) - successful
     
     def sanitize_filename(self, filename: str) -> str:
         """Remove invalid characters from filename"""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        return filename[:200]  # Limit length
+        return _sanitize_filename(filename)
     
     def set_download_path(self, path: str) -> bool:
         """Set custom download path"""
         try:
+            self._reset_meta_cache()
             self.download_path = Path(path)
             self.download_path.mkdir(parents=True, exist_ok=True)
             print(f"Download path set to: {self.download_path}")
@@ -1039,10 +1569,21 @@ def main():
     parser.add_argument('--append-id', action='store_true', help='Append [id] to filenames to avoid collisions')
     parser.add_argument('--retries', type=int, default=10, help='Download retry count')
     parser.add_argument('--fragment-retries', type=int, default=10, help='Fragment retry count')
+    parser.add_argument('--concurrent', type=int, default=1, help='Playlist videos to download at the same time')
+    parser.add_argument('--parallel', type=int, default=1, help='URLs to download at the same time (best with --yes)')
+    parser.add_argument('-y', '--yes', '--non-interactive', dest='yes', action='store_true',
+                       help='Never prompt: take the default answer (batch mode, no TTY needed)')
+    parser.add_argument('--format-id', help='Exact yt-dlp format selector; replaces manual selection in batch mode')
+    parser.add_argument('--no-meta-cache', action='store_true', help="Don't read or write the video metadata cache")
+    parser.add_argument('--clear-meta-cache', action='store_true', help='Delete the video metadata cache before starting')
     parser.add_argument('--list-formats-only', action='store_true', help='Print available formats for the given URL(s) and exit')
     
     args = parser.parse_args()
     
+    if args.yes and (args.interactive or not args.urls):
+        print("Error: --yes needs URLs on the command line and can't be combined with --interactive.")
+        sys.exit(2)
+    
     # Check for required dependencies
     try:
         import tqdm
@@ -1052,6 +1593,8 @@ def main():
         sys.exit(1)
     
     downloader = YouTubeDownloader()
+    downloader.interactive = not args.yes
+    downloader.format_id = args.format_id
     
     # Setup download path unless skipped
     if not args.skip_path_setup:
@@ -1063,32 +1606,16 @@ def main():
     if args.output:
         downloader.set_download_path(args.output)
 
+    downloader.use_meta_cache = not args.no_meta_cache
+    if args.clear_meta_cache:
+        downloader.clear_meta_cache()
+
     # List formats only and exit
     if args.list_formats_only:
         if not args.urls:
             print("Error: --list-formats-only requires at least one URL.")
             sys.exit(2)
-        for url in args.urls:
-            print(f"\n=== Formats for: {url} ===")
-            if downloader.is_playlist_url(url):
-                print("Note: URL is a playlist; showing formats for the first item only.")
-                plist = downloader.get_playlist_info(url)
-                if plist and plist.get('entries'):
-                    entry = plist['entries'][0]
-                    vid_url = None
-                    vid_id = entry.get('id')
-                    if vid_id:
-                        vid_url = f"https://www.youtube.com/watch?v={vid_id}"
-                    elif entry.get('url'):
-                        vid_url = entry['url']
-                    if vid_url:
-                        downloader.print_format_table(vid_url)
-                    else:
-                        print("Could not resolve first video URL from playlist.")
-                else:
-                    print("Could not load playlist entries.")
-            else:
-                downloader.print_format_table(url)
+        downloader.list_formats(args.urls)
         sys.exit(0)
     
     # Interactive mode
@@ -1136,18 +1663,22 @@ def main():
                             archive_file=args.archive_file,
                             append_id=args.append_id,
                             retries=args.retries,
-                            fragment_retries=args.fragment_retries
+                            fragment_retries=args.fragment_retries,
+                            concurrent=args.concurrent
                         )
                     else:
                         print("Invalid playlist URL")
                 
                 elif choice == '3':
-                    print("Enter URLs (one per line, empty line to finish):")
-                    urls = []
-                    while True:
-                        url = input().strip()
-                        if not url:
+                    print("Enter or paste URLs (one or more per line, empty line or EOF to finish):")
+                    # Read the pasted block straight from stdin, then validate it in one pass
+                    lines = []
+                    for line in iter(sys.stdin.readline, ''):
+                        if not line.strip():
                             break
+                        lines.append(line)
+                    urls = []
+                    for url in ' '.join(lines).split():
                         if downloader.is_valid_youtube_url(url):
                             urls.append(url)
                         else:
@@ -1165,7 +1696,8 @@ def main():
                             archive_file=args.archive_file,
                             append_id=args.append_id,
                             retries=args.retries,
-                            fragment_retries=args.fragment_retries
+                            fragment_retries=args.fragment_retries,
+                            concurrent=args.concurrent
                         )
                     else:
                         print("No valid URLs provided")
@@ -1178,7 +1710,7 @@ def main():
                     print(f"   Output: {downloader.download_path}")
                     
                     new_quality = input(f"New quality ({args.quality}) [best|worst|<height>p]: ").strip()
-                    if new_quality == '' or new_quality.lower() == 'best' or new_quality.lower() == 'worst' or re.match(r'^\d{3,4}p$', new_quality.lower()):
+                    if new_quality == '' or new_quality.lower() == 'best' or new_quality.lower() == 'worst' or _QUALITY_RE.match(new_quality.lower()):
                         if new_quality:
                             args.quality = new_quality
                         else:
@@ -1211,7 +1743,9 @@ def main():
             archive_file=args.archive_file,
             append_id=args.append_id,
             retries=args.retries,
-            fragment_retries=args.fragment_retries
+            fragment_retries=args.fragment_retries,
+            concurrent=args.concurrent,
+            max_workers=args.parallel
         )
 
 